@@ -0,0 +1,87 @@
+"""Measure the import (startup) cost of every entry point.
+
+Each module is imported in a fresh interpreter several times; the best wall time minus
+the cost of an empty interpreter is reported together with the heavy dependencies the
+import pulled in. Results can be saved and compared against an earlier run:
+
+    python scripts/import_benchmark.py --out import_times.json
+    python scripts/import_benchmark.py --baseline import_times.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "flask", "msal", "requests"]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_GUARD = re.compile(r"""^if __name__ == ["']__main__["']:""", re.MULTILINE)
+
+PROBE = (
+    "import json, sys; {imports}"
+    "print(json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+)
+
+
+def entry_points() -> list[str]:
+    """Every src module with a ``__main__`` block, so new entry points are measured too."""
+    src_dir = os.path.join(REPO_ROOT, "src")
+    modules = []
+    for name in sorted(os.listdir(src_dir)):
+        if not name.endswith(".py") or name == "__init__.py":
+            continue
+        with open(os.path.join(src_dir, name), "r", encoding="utf-8") as f:
+            if MAIN_GUARD.search(f.read()):
+                modules.append(f"src.{name[:-3]}")
+    return modules
+
+
+def run_probe(module: str | None) -> tuple[float, list[str]]:
+    code = PROBE.format(imports=f"import {module}; " if module else "", heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    return elapsed, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(module: str | None, repeat: int) -> tuple[float, list[str]]:
+    runs = [run_probe(module) for _ in range(repeat)]
+    return min(t for t, _ in runs), runs[0][1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point (best time is kept)")
+    parser.add_argument("--out", default=None, help="Save results as JSON")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    interpreter, _ = measure(None, args.repeat)
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = {row["module"]: row for row in json.load(f)["results"]}
+
+    results = []
+    print(f"Empty interpreter: {interpreter * 1000:.1f} ms")
+    for module in entry_points():
+        elapsed, heavy = measure(module, args.repeat)
+        import_ms = max(0.0, (elapsed - interpreter) * 1000)
+        results.append({"module": module, "import_ms": round(import_ms, 1), "heavy_modules": heavy})
+        line = f"{module:<16} {import_ms:8.1f} ms  {', '.join(heavy) or '-'}"
+        if module in baseline:
+            line += f"  (baseline {baseline[module]['import_ms']:.1f} ms)"
+        print(line)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version, "interpreter_ms": round(interpreter * 1000, 1), "results": results}, f, indent=2)
+        print(f"Saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
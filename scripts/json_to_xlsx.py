@@ -1,35 +1,294 @@
-import pandas as pd
+"""Convert a battle log (JSON array or NDJSON, one round per line) into an Excel workbook.
+
+The log is parsed round by round and every row goes straight into an openpyxl
+write-only worksheet, which spools it to a temporary file until the workbook is saved,
+so memory use does not grow with the size of the log. The sheets match
+``src.exporter.export_log_to_excel`` (Events, Timeline, Team, bold header, frozen first
+row, autofilter); a sheet that would exceed Excel's row limit continues on
+``Events_2``, ``Events_3``...
+
+    python scripts/json_to_xlsx.py battle_log.json battle_log.xlsx
+    python scripts/json_to_xlsx.py big_log.ndjson big_log.xlsx --sheets events,team
+"""
+import argparse
+import codecs
 import json
-import sys
+import math
 import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.exporter import _round_event_rows, _round_team_rows, _round_timeline_rows  # noqa: E402
+
+CHUNK_SIZE = 1024 * 1024
+EXCEL_MAX_ROWS = 1_048_576
+SHEET_NAMES = {"events": "Events", "timeline": "Timeline", "team": "Team"}
+WRAPPER_KEYS = ("log", "entries")
+BOLD = Font(bold=True)
+
+
+def iter_rounds(path: str, progress: Optional[Callable[[int], None]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the rounds of a JSON array, NDJSON, concatenated JSON or ``{"log": [...]}``
+    file one at a time.
+
+    ``progress`` is called with the number of bytes read so far after every chunk.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    with open(path, "rb") as f:
+        buf = ""
+        pos = 0
+        bytes_read = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, bytes_read, eof
+            if eof:
+                return False
+            chunk = f.read(CHUNK_SIZE)
+            bytes_read += len(chunk)
+            eof = not chunk
+            # drop the consumed prefix so the buffer only holds the round being parsed
+            buf = buf[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+            if progress:
+                progress(bytes_read)
+            return bool(chunk)
+
+        def skip(chars: str) -> bool:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf):
+                    return True
+                if not fill():
+                    return False
+
+        def next_value() -> Any:
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+                # a number at the end of the buffer may continue in the next chunk
+                if end == len(buf) and not eof and not isinstance(value, (dict, list)):
+                    fill()
+                    continue
+                pos = end
+                return value
+
+        def array_items() -> Iterator[Any]:
+            # called just past the opening "["
+            nonlocal pos
+            while skip(" \t\r\n,"):
+                if buf[pos] == "]":
+                    pos += 1
+                    return
+                yield next_value()
+            raise ValueError(f"Unexpected end of file, the JSON array is not closed: {path}")
+
+        def object_rounds() -> Iterator[Any]:
+            """A top-level object member by member: the items of a {"log": [...]} or
+            {"entries": [...]} wrapper are streamed like a top-level array, any other object
+            is a round of its own."""
+            nonlocal pos
+            pos += 1
+            members: Dict[str, Any] = {}
+            wrapped = False
+            while skip(" \t\r\n,"):
+                if buf[pos] == "}":
+                    pos += 1
+                    if not wrapped:
+                        yield members
+                    return
+                key = next_value()
+                if not skip(" \t\r\n"):
+                    break
+                if buf[pos] != ":":
+                    raise ValueError(f"Expected ':' after the key {key!r}: {path}")
+                pos += 1
+                if not skip(" \t\r\n"):
+                    break
+                if key in WRAPPER_KEYS and buf[pos] == "[" and not wrapped:
+                    pos += 1
+                    wrapped = True
+                    yield from array_items()
+                else:
+                    members[key] = next_value()
+            raise ValueError(f"Unexpected end of file, the JSON object is not closed: {path}")
+
+        if not skip(" \t\r\n"):
+            return
+        if buf[pos] == "[":
+            pos += 1
+            yield from array_items()
+            return
+
+        while skip(" \t\r\n"):
+            if buf[pos] == "{":
+                yield from object_rounds()
+            else:
+                yield next_value()
+
+
+def _cell_value(value: Any) -> Any:
+    """Values as pandas' Excel export writes them: NaN empty, infinities and other
+    non-finite floats as text, and no XML-illegal control characters in strings."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None if math.isnan(value) else ("inf" if value > 0 else "-inf")
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+
+class _Sheet:
+    def __init__(self, worksheet, columns: List[str]):
+        self.worksheet = worksheet
+        self.columns = columns
+        self.rows = 0
+
+
+class XlsxStreamWriter:
+    """Streams rows into openpyxl write-only worksheets, which spool every sheet to a
+    temporary file until the workbook is saved, so rows never stay in memory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheets: List[_Sheet] = []
+        self.current: Dict[str, _Sheet] = {}
+        self.parts: Dict[str, int] = {}
+
+    def _start_sheet(self, title: str, columns: List[str]) -> _Sheet:
+        parts = self.parts.get(title, 0) + 1
+        self.parts[title] = parts
+        worksheet = self.workbook.create_sheet(title if parts == 1 else f"{title}_{parts}")
+        worksheet.freeze_panes = "A2"
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.font = BOLD
+            header.append(cell)
+        worksheet.append(header)
+        sheet = _Sheet(worksheet, columns)
+        sheet.rows = 1
+        self.current[title] = sheet
+        self.sheets.append(sheet)
+        return sheet
+
+    def add_sheet(self, title: str, columns: List[str]):
+        if title not in self.current:
+            self._start_sheet(title, columns)
+
+    def append(self, title: str, rows: List[Dict[str, Any]]):
+        for row in rows:
+            sheet = self.current.get(title)
+            if sheet is None:
+                sheet = self._start_sheet(title, list(row))
+            elif sheet.rows >= EXCEL_MAX_ROWS:
+                sheet = self._start_sheet(title, sheet.columns)
+            sheet.worksheet.append([_cell_value(row.get(column)) for column in sheet.columns])
+            sheet.rows += 1
+
+    def close(self):
+        for sheet in self.sheets:
+            if sheet.rows > 1 and sheet.columns:
+                sheet.worksheet.auto_filter.ref = f"A1:{get_column_letter(len(sheet.columns))}{sheet.rows}"
+        self.workbook.save(self.path)
+
+
+def convert(
+    json_path: str,
+    xlsx_path: str,
+    sheets: List[str],
+    progress_every: float = 2.0,
+    out=sys.stderr,
+) -> Dict[str, int]:
+    total_bytes = os.path.getsize(json_path)
+    writer = XlsxStreamWriter(xlsx_path)
+    started = time.perf_counter()
+    counts = {"rounds": 0, **{key: 0 for key in sheets}}
+    last_report = started
+
+    def report(bytes_read: int, force: bool = False):
+        nonlocal last_report
+        now = time.perf_counter()
+        if not force and now - last_report < progress_every:
+            return
+        last_report = now
+        percent = bytes_read / total_bytes * 100 if total_bytes else 100.0
+        out.write(
+            f"{bytes_read / 1e6:,.1f} / {total_bytes / 1e6:,.1f} MB ({percent:.1f}%), "
+            f"{counts['rounds']} kör, {now - started:.1f} s\n"
+        )
+        out.flush()
+
+    global_turn = 0
+    for round_index, round_data in enumerate(iter_rounds(json_path, progress=report if progress_every > 0 else None)):
+        if not isinstance(round_data, dict):
+            raise ValueError(f"A(z) {round_index}. kör nem JSON objektum: {str(round_data)[:80]}")
+        for key in sheets:
+            if key == "events":
+                rows = _round_event_rows(round_data)
+            elif key == "timeline":
+                rows = _round_timeline_rows(round_data, round_index, global_turn)
+            else:
+                rows = _round_team_rows(round_data)
+            writer.append(SHEET_NAMES[key], rows)
+            counts[key] += len(rows)
+        global_turn += len(round_data.get("events", []))
+        counts["rounds"] += 1
+
+    # an empty log still gets its (empty) sheets
+    for key in sheets:
+        writer.add_sheet(SHEET_NAMES[key], [])
+    writer.close()
+    if progress_every > 0:
+        report(total_bytes, force=True)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Battle log (JSON tömb / NDJSON) konvertálása Excelbe, állandó memóriával")
+    parser.add_argument("json_path", nargs="?", default="../battle_log.json", help="Bemeneti log (.json / .ndjson)")
+    parser.add_argument("xlsx_path", nargs="?", default="../battle_log.xlsx", help="Kimeneti Excel fájl")
+    parser.add_argument(
+        "--sheets", default="events,timeline,team", help="Vesszővel elválasztott lapok: events, timeline, team"
+    )
+    parser.add_argument("--progress-every", type=float, default=2.0, help="Állapotjelzés gyakorisága (s), 0 = kikapcsolva")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.json_path):
+        print(f"Hiba: {args.json_path} nem található!")
+        sys.exit(1)
+    sheets = [name.strip().lower() for name in args.sheets.split(",") if name.strip()]
+    unknown = [name for name in sheets if name not in SHEET_NAMES]
+    if unknown or not sheets:
+        print(f"Hiba: ismeretlen lap: {', '.join(unknown) or '-'} (választható: {', '.join(SHEET_NAMES)})")
+        sys.exit(1)
+
+    try:
+        counts = convert(args.json_path, args.xlsx_path, sheets, progress_every=args.progress_every)
+    except (ValueError, OSError) as e:
+        print(f"Hiba az exportáláskor: {e}")
+        sys.exit(1)
+    rows = ", ".join(f"{SHEET_NAMES[key]}: {counts[key]} sor" for key in sheets)
+    print(f"Sikeres export: {args.xlsx_path} ({counts['rounds']} kör; {rows})")
+
 
-# Alapértelmezett bemenet/kimenet
-JSON_PATH = sys.argv[1] if len(sys.argv) > 1 else "../battle_log.json"
-XLSX_PATH = sys.argv[2] if len(sys.argv) > 2 else "../battle_log.xlsx"
-
-if not os.path.exists(JSON_PATH):
-    print(f"Hiba: {JSON_PATH} nem található!")
-    sys.exit(1)
-
-with open(JSON_PATH, "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-# Ha a json egy lista, DataFrame-be rakjuk
-if isinstance(data, list):
-    df = pd.DataFrame(data)
-else:
-    # Ha dict, próbáljuk a 'log' vagy 'entries' kulcsot
-    if "log" in data:
-        df = pd.DataFrame(data["log"])
-    elif "entries" in data:
-        df = pd.DataFrame(data["entries"])
-    else:
-        df = pd.DataFrame([data])
-
-# Excelbe mentés
-try:
-    df.to_excel(XLSX_PATH, index=False)
-    print(f"Sikeres export: {XLSX_PATH}")
-except Exception as e:
-    print(f"Hiba az exportáláskor: {e}")
-    sys.exit(1)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Load test for the web app: concurrent clients against `/`, `/save`, `/simulate` and
+`/excel/download` in a configurable mix.
+
+By default the app is built with ``create_app`` on copies of the example inputs in a
+temporary directory (the repo files are never written) and served by a threaded
+werkzeug server. ``create_app`` gets a stub uploader that only sleeps, so the
+background upload path runs without network access. ``--url`` targets an already
+running server instead; ``save`` is then left out of the default mix, because it would
+overwrite the server's hero roster, unless ``--allow-save`` is given. Results can be saved and compared against an earlier run:
+
+    python scripts/load_test.py --concurrency 16 --duration 20 --out load_test.json
+    python scripts/load_test.py --concurrency 16 --duration 20 --baseline load_test.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote_plus, urlencode, urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+ENDPOINTS = ("index", "save", "simulate", "download")
+DEFAULT_MIX = "index=60,save=10,simulate=20,download=10"
+HERO_FORM_FIELDS = (
+    "name", "hp", "atk", "defense", "resistance", "accuracy", "speed", "crit_rate", "crit_damage",
+    "a1_priority", "a1_cooldown", "a2_priority", "a2_cooldown", "a3_priority", "a3_cooldown", "a4_priority", "a4_cooldown",
+)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r} in mix (expected {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one endpoint with a positive weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def hero_form(heroes: List[Dict[str, Any]]) -> str:
+    """The hero editor form as the browser posts it to /save."""
+    fields: Dict[str, Any] = {"hero_count": len(heroes)}
+    for index, hero in enumerate(heroes):
+        for field in HERO_FORM_FIELDS:
+            fields[f"hero_{index}_{field}"] = hero.get(field, "")
+        if hero.get("selected"):
+            fields[f"hero_{index}_selected"] = "on"
+    return urlencode(fields)
+
+
+class Client:
+    """One simulated user with its own keep-alive connection."""
+
+    def __init__(self, host: str, port: int, save_body: str, rounds: int):
+        self.host = host
+        self.port = port
+        self.save_body = save_body
+        self.simulate_body = urlencode({"rounds": rounds})
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[str] = None) -> Tuple[int, Dict[str, str], int]:
+        headers = {"Content-Type": "application/x-www-form-urlencoded"} if body is not None else {}
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                size = len(response.read())
+                return response.status, {k.lower(): v for k, v in response.getheaders()}, size
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # the server closed an idle keep-alive connection; retry once on a new one
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        raise RuntimeError("unreachable")
+
+    def run(self, endpoint: str) -> Tuple[bool, str]:
+        """Send one request; returns (ok, detail)."""
+        if endpoint == "index":
+            status, _, _ = self.request("GET", "/")
+            return status == 200, str(status)
+        if endpoint == "download":
+            status, headers, size = self.request("GET", "/excel/download")
+            if status == 302:
+                # no simulation yet: the app redirects with a message
+                return True, "302"
+            return status == 200 and size > 0, str(status)
+
+        body = self.save_body if endpoint == "save" else self.simulate_body
+        status, headers, _ = self.request("POST", f"/{endpoint}", body)
+        if status != 302:
+            return False, str(status)
+        # the form endpoints report failures in the redirect message
+        message = unquote_plus(urlsplit(headers.get("location", "")).query).lower()
+        return "hiba" not in message, "302" if "hiba" not in message else "302 (hiba)"
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def build_local_app(workdir: str, upload_delay: float, rounds: int):
+    import src.webapp as webapp
+
+    for name, source in (
+        ("team.yaml", "examples/team.yaml"),
+        ("boss.yaml", "examples/boss.yaml"),
+        ("boss_abilities.yaml", "boss_abilities.yaml"),
+    ):
+        shutil.copyfile(os.path.join(REPO_ROOT, source), os.path.join(workdir, name))
+
+    def stub_upload(local_path, remote_path, client_id, tenant_id=None, cache_dir=None):
+        time.sleep(upload_delay)
+        return f"https://onedrive.example/{os.path.basename(remote_path)}"
+
+    return webapp.create_app(
+        heroes_path=os.path.join(workdir, "team.yaml"),
+        boss_path=os.path.join(workdir, "boss.yaml"),
+        abilities_path=os.path.join(workdir, "boss_abilities.yaml"),
+        team_output_path=os.path.join(workdir, "team_selected.yaml"),
+        out_path=os.path.join(workdir, "battle_log.json"),
+        excel_out_path=os.path.join(workdir, "battle_log.xlsx"),
+        onedrive_client_id="load-test",
+        onedrive_tenant=None,
+        onedrive_remote=None,
+        default_rounds=rounds,
+        export_cache_dir=os.path.join(workdir, "exports"),
+        uploader=stub_upload,
+    )
+
+
+def run_load(
+    host: str,
+    port: int,
+    save_body: str,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: Optional[float],
+    total_requests: Optional[int],
+    rounds: int,
+    seed: int,
+) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, int]], float]:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    outcomes: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    lock = threading.Lock()
+    issued = 0
+    stop_at = time.perf_counter() + duration if duration else None
+
+    def next_slot() -> bool:
+        nonlocal issued
+        with lock:
+            if total_requests is not None and issued >= total_requests:
+                return False
+            issued += 1
+        return stop_at is None or time.perf_counter() < stop_at
+
+    def user(index: int):
+        rng = random.Random(f"{seed}:{index}")
+        client = Client(host, port, save_body, rounds)
+        try:
+            while next_slot():
+                endpoint = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    ok, detail = client.run(endpoint)
+                except Exception as error:
+                    ok, detail = False, type(error).__name__
+                    client.close()
+                    client.conn = None
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies[endpoint].append(elapsed * 1000)
+                    outcomes[endpoint][detail] = outcomes[endpoint].get(detail, 0) + 1
+                    if not ok:
+                        outcomes[endpoint]["errors"] = outcomes[endpoint].get("errors", 0) + 1
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, outcomes, time.perf_counter() - started
+
+
+def summarize_endpoint(latencies: List[float], outcomes: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    errors = outcomes.get("errors", 0)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "error_rate": errors / len(values) if values else 0.0,
+        "throughput_rps": len(values) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+        "statuses": {key: count for key, count in outcomes.items() if key != "errors"},
+    }
+
+
+def format_row(name: str, row: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    line = (
+        f"{name:<10}{row['requests']:>8}{row['throughput_rps']:>9.1f}{row['error_rate'] * 100:>8.1f}%"
+        f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+    )
+    if baseline:
+        line += f"  (baseline p95 {baseline['p95_ms']:.1f} ms, {baseline['throughput_rps']:.1f} req/s)"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the web app with concurrent simulated users")
+    parser.add_argument("--url", default=None, help="Running server to test (default: start a local app on copies of the examples)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Simultaneous users")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test length in seconds (0 = use --requests)")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument(
+        "--mix", default=None, help=f"Endpoint weights (default: {DEFAULT_MIX}; without save for --url)"
+    )
+    parser.add_argument(
+        "--allow-save",
+        action="store_true",
+        help="With --url, allow /save requests; they overwrite the server's hero roster and selected team",
+    )
+    parser.add_argument("--rounds", type=int, default=50, help="Rounds per /simulate request")
+    parser.add_argument("--upload-delay", type=float, default=0.5, help="Seconds the stub OneDrive upload takes")
+    parser.add_argument("--warmup", type=int, default=5, help="Requests per endpoint before measuring")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request mix")
+    parser.add_argument("--out", default=None, help="Save results as JSON")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix or DEFAULT_MIX)
+    if not args.duration and not args.requests:
+        parser.error("set --duration or --requests")
+    if args.url and "save" in mix and not args.allow_save:
+        # /save posts the example roster, which would replace the real server's heroes
+        if args.mix:
+            parser.error("save in --mix overwrites the server's hero files; add --allow-save to do it anyway")
+        del mix["save"]
+    mix_text = ",".join(f"{name}={weight:g}" for name, weight in mix.items())
+
+    from src.io import load_data
+    from src.web_hero import normalize_heroes
+
+    server = None
+    workdir = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+        heroes_path = os.path.join(REPO_ROOT, "examples/team.yaml")
+    else:
+        import logging
+
+        from werkzeug.serving import make_server
+
+        # the per-request access log would drown the report
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        workdir = tempfile.mkdtemp(prefix="raid-load-test-")
+        app = build_local_app(workdir, args.upload_delay, args.rounds)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = "127.0.0.1", server.server_port
+        heroes_path = app.config["HEROES_PATH"]
+    save_body = hero_form(normalize_heroes(load_data(heroes_path)))
+
+    try:
+        if args.warmup:
+            warmup = Client(host, port, save_body, args.rounds)
+            for endpoint in ("simulate", *mix):
+                for _ in range(args.warmup):
+                    warmup.run(endpoint)
+            warmup.close()
+
+        latencies, outcomes, elapsed = run_load(
+            host, port, save_body, mix, args.concurrency, args.duration or None, args.requests, args.rounds, args.seed
+        )
+    finally:
+        if server is not None:
+            server.shutdown()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    endpoints = {name: summarize_endpoint(latencies[name], outcomes[name], elapsed) for name in mix}
+    overall = summarize_endpoint(
+        [value for name in mix for value in latencies[name]],
+        {"errors": sum(outcomes[name].get("errors", 0) for name in mix)},
+        elapsed,
+    )
+    baseline: Dict[str, Any] = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{args.concurrency} users, {elapsed:.1f} s, mix {mix_text}")
+    print(f"{'Endpoint':<10}{'Reqs':>8}{'Req/s':>9}{'Errors':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in endpoints.items():
+        print(format_row(name, row, baseline.get("endpoints", {}).get(name)))
+    print(format_row("total", overall, baseline.get("overall")))
+    for name, row in endpoints.items():
+        if row["errors"]:
+            print(f"{name} errors: {row['statuses']}")
+
+    if args.out:
+        result = {
+            "python": sys.version,
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "rounds": args.rounds,
+            "elapsed_s": round(elapsed, 3),
+            "overall": overall,
+            "endpoints": endpoints,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Stat-upgrade advisor: the marginal damage gain of one upgrade per team member.
+
+Every upgrade of every hero is evaluated on the same seeds as the baseline (common
+random numbers), so the per-trial gain cancels most of the crit noise. The trials are
+batched so that most perturbations cost no extra fight:
+
+- ATK, crit rate and crit damage do not change the turn order, cooldowns or the boss's
+  targets, and every actor draws its crit rolls from its own seeded stream. When the
+  boss cannot die (``infinite_hp``), the baseline fight is therefore replayed through
+  ``calc_damage`` with the recorded crit draws for each perturbed hero, which gives the
+  exact damage the perturbed fight would deal.
+- A speed upgrade that leaves the action order unchanged yields the same fight, so its
+  gain is exactly zero; only order-changing speed upgrades are simulated again.
+
+Finite-HP bosses (the fight length depends on the damage) fall back to one simulation
+per perturbation, still on common seeds.
+"""
+import argparse
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .io import save_data
+from .models import Boss, TeamMember
+from .montecarlo import Z_95, build_fight, load_inputs, summarize, total_team_damage
+from .simulator import action_order, actor_stream, calc_damage, run_simulation
+
+# key -> (member attribute, step, label); crit values are the normalized fractions
+UPGRADES: Dict[str, Tuple[str, float, str]] = {
+    "speed": ("speed", 10, "+10 SPD"),
+    "crit_rate": ("crit_rate", 0.05, "+5% C.RATE"),
+    "crit_damage": ("crit_damage", 0.20, "+20% C.DMG"),
+    "atk": ("atk", 500, "+500 ATK"),
+}
+REPLAYABLE = ("crit_rate", "crit_damage", "atk")
+
+
+class _Draw:
+    """Stands in for an actor's random stream in calc_damage and returns a recorded roll."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def random(self) -> float:
+        return self.value
+
+
+def _damage_multiplier(boss: Boss) -> float:
+    multiplier = 1.0
+    for ab in boss.abilities.get("on_take_damage", []):
+        if ab.get("type") == "damage_multiplier":
+            multiplier *= float(ab.get("value", 1.0))
+    return multiplier
+
+
+def _member_attacks(
+    log: List[Dict[str, Any]], boss: Boss, team: List[TeamMember], seed: int
+) -> Optional[Dict[str, List[Tuple[float, float, int]]]]:
+    """(ability multiplier, crit roll, logged damage) of every attack per member, or None
+    when replaying the baseline does not reproduce the logged damage exactly."""
+    members = {member.name: member for member in team}
+    streams = {name: actor_stream(seed, name) for name in members}
+    attacks: Dict[str, List[Tuple[float, float, int]]] = {name: [] for name in members}
+    dmg_multiplier = _damage_multiplier(boss)
+    for round_data in log:
+        for event in round_data.get("events", []):
+            member = members.get(event["actor"])
+            if member is None:
+                continue
+            # each member's stream is only drawn from for its own crit rolls
+            roll = streams[member.name].random()
+            ability_cfg = member.abilities.get(event["ability"], {})
+            extra = float(ability_cfg.get("multiplier", member.skill_multiplier))
+            if int(calc_damage(member, boss, extra_multiplier=extra, rng=_Draw(roll)) * dmg_multiplier) != event["dmg"]:
+                return None
+            attacks[member.name].append((extra, roll, event["dmg"]))
+    return attacks
+
+
+def _replayed_damage(member: TeamMember, boss: Boss, attacks: List[Tuple[float, float, int]], dmg_multiplier: float) -> int:
+    return sum(
+        int(calc_damage(member, boss, extra_multiplier=extra, rng=_Draw(roll)) * dmg_multiplier)
+        for extra, roll, _ in attacks
+    )
+
+
+def _perturbed_total(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]],
+    rounds: int,
+    seed: int,
+    index: int,
+    attr: str,
+    step: float,
+) -> int:
+    boss, team = build_fight(boss_data, team_rows, abilities)
+    setattr(team[index], attr, getattr(team[index], attr) + step)
+    return total_team_damage(run_simulation(boss, team, rounds=rounds, seed=seed))
+
+
+def _order_changes(boss: Boss, team: List[TeamMember], index: int, step: float) -> bool:
+    before = [actor.name for actor in action_order(boss, team)]
+    team[index].speed += step
+    try:
+        return [actor.name for actor in action_order(boss, team)] != before
+    finally:
+        team[index].speed -= step
+
+
+def advise_upgrades(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    trials: int = 200,
+    base_seed: int = 0,
+    upgrades: Optional[List[str]] = None,
+    z: float = Z_95,
+) -> Dict[str, Any]:
+    """Mean total-damage gain (with CI) of each upgrade for each team member.
+
+    Returns ``ranking`` (all hero/upgrade pairs, best first), ``best`` (the top upgrade
+    per hero), the baseline damage summary and how many fights were actually simulated.
+    """
+    upgrades = list(upgrades or UPGRADES)
+    for key in upgrades:
+        if key not in UPGRADES:
+            raise ValueError(f"Unknown upgrade {key!r} (expected one of {', '.join(UPGRADES)})")
+    started = time.perf_counter()
+    boss, team = build_fight(boss_data, team_rows, abilities)
+    names = [member.name for member in team]
+    # speed upgrades that keep the action order cannot change any fight
+    speed_resim = {index: _order_changes(boss, team, index, UPGRADES["speed"][1]) for index in range(len(team))}
+
+    baseline: List[int] = []
+    gains: Dict[Tuple[int, str], List[int]] = {(index, key): [] for index in range(len(team)) for key in upgrades}
+    simulated = 0
+    replayed = 0
+    for trial in range(trials):
+        seed = base_seed + trial
+        boss, team = build_fight(boss_data, team_rows, abilities)
+        log = run_simulation(boss, team, rounds=rounds, seed=seed)
+        simulated += 1
+        base_total = total_team_damage(log)
+        baseline.append(base_total)
+        attacks = _member_attacks(log, boss, team, seed) if boss.extra.get("infinite_hp", False) else None
+        dmg_multiplier = _damage_multiplier(boss)
+
+        for index, member in enumerate(team):
+            base_member = sum(dmg for _, _, dmg in attacks[member.name]) if attacks is not None else 0
+            for key in upgrades:
+                attr, step, _ = UPGRADES[key]
+                if key == "speed" and not speed_resim[index]:
+                    gains[(index, key)].append(0)
+                elif key in REPLAYABLE and attacks is not None:
+                    original = getattr(member, attr)
+                    setattr(member, attr, original + step)
+                    try:
+                        gain = _replayed_damage(member, boss, attacks[member.name], dmg_multiplier) - base_member
+                    finally:
+                        setattr(member, attr, original)
+                    gains[(index, key)].append(gain)
+                    replayed += 1
+                else:
+                    total = _perturbed_total(boss_data, team_rows, abilities, rounds, seed, index, attr, step)
+                    gains[(index, key)].append(total - base_total)
+                    simulated += 1
+
+    base_summary = summarize(baseline, z=z)
+    ranking = []
+    for (index, key), samples in gains.items():
+        summary = summarize(samples, z=z)
+        ranking.append(
+            {
+                "hero": names[index],
+                "upgrade": key,
+                "label": UPGRADES[key][2],
+                "gain": summary["mean"],
+                "ci_low": summary["ci_low"] if summary["stdev"] else summary["mean"],
+                "ci_high": summary["ci_high"] if summary["stdev"] else summary["mean"],
+                "gain_pct": summary["mean"] / base_summary["mean"] * 100 if base_summary["mean"] else 0.0,
+            }
+        )
+    ranking.sort(key=lambda row: -row["gain"])
+    best: Dict[str, Dict[str, Any]] = {}
+    for row in ranking:
+        best.setdefault(row["hero"], row)
+    return {
+        "ranking": ranking,
+        "best": [best[name] for name in names if name in best],
+        "baseline": base_summary,
+        "trials": trials,
+        "simulated_fights": simulated,
+        "replayed_perturbations": replayed,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def format_advice(result: Dict[str, Any]) -> str:
+    base = result["baseline"]
+    lines = [
+        f"Baseline: mean {base['mean']:.0f} ± {base['half_width']:.0f} damage ({result['trials']} trials)",
+        f"{'#':>3}  {'Hero':<16}{'Upgrade':<13}{'Gain':>10}{'95% CI':>22}{'Gain %':>9}",
+    ]
+    for place, row in enumerate(result["ranking"], start=1):
+        ci = f"[{row['ci_low']:.0f}, {row['ci_high']:.0f}]"
+        lines.append(
+            f"{place:>3}  {row['hero']:<16}{row['label']:<13}{row['gain']:>10.0f}{ci:>22}{row['gain_pct']:>8.2f}%"
+        )
+    lines.append(
+        f"{result['simulated_fights']} fights simulated, {result['replayed_perturbations']} perturbations replayed "
+        f"in {result['elapsed']:.2f} s"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank single stat upgrades by their marginal damage gain")
+    parser.add_argument("--boss", required=True, help="Path to boss file (yaml/json/csv/xlsx)")
+    parser.add_argument("--team", required=True, help="Path to team file (yaml/json/csv/xlsx)")
+    parser.add_argument("--abilities", required=False, help="Path to boss abilities YAML", default=None)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--trials", type=int, default=200, help="Common-seed trials per upgrade")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first trial")
+    parser.add_argument(
+        "--upgrade",
+        action="append",
+        choices=list(UPGRADES),
+        default=None,
+        help="Limit the advice to these upgrades (repeatable; default: all)",
+    )
+    parser.add_argument("--out", required=False, help="Optional JSON/YAML file for the full result", default=None)
+    args = parser.parse_args()
+
+    boss_data, team_rows, abilities = load_inputs(args.boss, args.team, args.abilities)
+    result = advise_upgrades(
+        boss_data,
+        team_rows,
+        abilities,
+        rounds=args.rounds,
+        trials=args.trials,
+        base_seed=args.seed,
+        upgrades=args.upgrade,
+    )
+    print(format_advice(result))
+    if args.out:
+        save_data(result, args.out)
+        print(f"Advice saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Run many simulation scenarios from one manifest on a pool of warm worker processes.
+
+Manifest format (paths are relative to the manifest file)::
+
+    defaults:
+      abilities: boss_abilities.yaml
+      rounds: 50
+    scenarios:
+      - name: unm-base
+        boss: examples/boss.yaml
+        team: examples/team_selected.yaml
+      - name: unm-100
+        boss: examples/boss.yaml
+        team: examples/team_selected.yaml
+        rounds: 100
+        trials: 200
+        seed: 1
+
+Every distinct input file is parsed once in the parent process and handed to the
+workers when the pool starts, so scenarios only pay for the fight itself.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from .io import load_data, save_data
+from .montecarlo import build_fight, run_trials, summarize, total_team_damage
+from .simulator import run_simulation
+
+SCENARIO_FILE_KEYS = ("boss", "team", "abilities")
+
+_FILES: Dict[str, Any] = {}
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    manifest = load_data(path)
+    if isinstance(manifest, list):
+        manifest = {"scenarios": manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("scenarios"), list):
+        raise ValueError(f"Manifest must contain a 'scenarios' list: {path}")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    defaults = manifest.get("defaults", {}) or {}
+    scenarios = []
+    names = set()
+    for index, raw in enumerate(manifest["scenarios"], start=1):
+        scenario = {"rounds": 50, "trials": 1, "seed": None, "abilities": None, **defaults, **raw}
+        for key in SCENARIO_FILE_KEYS:
+            if scenario.get(key):
+                scenario[key] = os.path.normpath(os.path.join(base_dir, scenario[key]))
+        if not scenario.get("boss") or not scenario.get("team"):
+            raise ValueError(f"Scenario #{index} needs both 'boss' and 'team'")
+        scenario.setdefault("name", f"scenario-{index}")
+        if scenario["name"] in names:
+            # logs are written to <log_dir>/<name>.json, so names must be unique
+            raise ValueError(f"Scenario #{index} reuses the name {scenario['name']!r}")
+        names.add(scenario["name"])
+        scenarios.append(scenario)
+    return scenarios
+
+
+def load_scenario_files(scenarios: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+    """Parse every distinct input file once; returns the parsed files and the load error
+    of every file that could not be read."""
+    files: Dict[str, Any] = {}
+    errors: Dict[str, Exception] = {}
+    for scenario in scenarios:
+        for key in SCENARIO_FILE_KEYS:
+            path = scenario.get(key)
+            if path and path not in files and path not in errors:
+                try:
+                    files[path] = load_data(path)
+                except Exception as error:
+                    errors[path] = error
+    return files, errors
+
+
+def _init_worker(files: Dict[str, Any]):
+    _FILES.clear()
+    _FILES.update(files)
+
+
+def run_scenario(scenario: Dict[str, Any], log_dir: Optional[str] = None, local_trials: bool = True) -> Dict[str, Any]:
+    started = time.perf_counter()
+    boss_data = _FILES[scenario["boss"]]
+    team_data = _FILES[scenario["team"]]
+    abilities = _FILES.get(scenario["abilities"]) if scenario.get("abilities") else None
+
+    boss_data = boss_data if isinstance(boss_data, dict) else boss_data[0]
+    team_rows = team_data if isinstance(team_data, list) else [team_data]
+    abilities = abilities if isinstance(abilities, dict) else None
+    rounds = int(scenario["rounds"])
+    seed = scenario.get("seed")
+
+    boss, team = build_fight(boss_data, team_rows, abilities)
+    log = run_simulation(boss, team, rounds=rounds, seed=seed)
+    if log_dir:
+        save_data(log, os.path.join(log_dir, f"{scenario['name']}.json"))
+
+    row = {
+        "name": scenario["name"],
+        "boss": scenario["boss"],
+        "team": scenario["team"],
+        "abilities": scenario.get("abilities"),
+        "rounds": rounds,
+        "rounds_played": len(log),
+        "total_damage": total_team_damage(log),
+        "boss_hp_end": log[-1]["boss_hp"] if log else None,
+        "team_alive_end": sum(1 for t in log[-1]["team"] if t["alive"]) if log else None,
+    }
+    trials = int(scenario.get("trials") or 1)
+    if trials > 1 and local_trials:
+        summary = summarize(
+            run_trials(boss_data, team_rows, abilities, rounds=rounds, trials=trials, base_seed=seed or 0)
+        )
+        row.update(
+            {
+                "trials": trials,
+                "mean_damage": summary["mean"],
+                "ci_low": summary["ci_low"],
+                "ci_high": summary["ci_high"],
+            }
+        )
+    row["seconds"] = time.perf_counter() - started
+    return row
+
+
+def run_batch(
+    scenarios: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    log_dir: Optional[str] = None,
+    progress=print,
+    cluster: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Run every scenario; with ``cluster`` (host:port list) the trial statistics of all
+    scenarios are sharded across src.cluster workers as one sweep."""
+    files, file_errors = load_scenario_files(scenarios)
+    local_trials = cluster is None
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(scenarios)
+    done = 0
+
+    def report(index: int, row: Dict[str, Any]):
+        nonlocal done
+        done += 1
+        results[index] = row
+        if progress:
+            if row.get("error"):
+                progress(f"[{done}/{len(scenarios)}] {row['name']}: failed: {row['error']}")
+            else:
+                progress(
+                    f"[{done}/{len(scenarios)}] {row['name']}: {row['total_damage']} damage in {row['seconds'] * 1000:.1f} ms"
+                )
+
+    def failed(scenario: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        # one broken scenario must not cost the results of the others
+        return {
+            "name": scenario["name"],
+            "boss": scenario["boss"],
+            "team": scenario["team"],
+            "abilities": scenario.get("abilities"),
+            "rounds": scenario.get("rounds"),
+            "error": f"{type(error).__name__}: {error}",
+        }
+
+    runnable = []
+    for index, scenario in enumerate(scenarios):
+        broken = next((scenario[key] for key in SCENARIO_FILE_KEYS if scenario.get(key) in file_errors), None)
+        if broken is None:
+            runnable.append(index)
+        else:
+            report(index, failed(scenario, file_errors[broken]))
+
+    if workers == 1:
+        _init_worker(files)
+        for index in runnable:
+            scenario = scenarios[index]
+            try:
+                row = run_scenario(scenario, log_dir, local_trials)
+            except Exception as error:
+                row = failed(scenario, error)
+            report(index, row)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(files,)) as pool:
+            futures = {
+                pool.submit(run_scenario, scenarios[index], log_dir, local_trials): index for index in runnable
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    row = future.result()
+                except Exception as error:
+                    row = failed(scenarios[index], error)
+                report(index, row)
+
+    if cluster:
+        _run_cluster_trials(scenarios, files, results, cluster, progress)
+    return results
+
+
+def _run_cluster_trials(
+    scenarios: List[Dict[str, Any]],
+    files: Dict[str, Any],
+    results: List[Dict[str, Any]],
+    cluster: str,
+    progress,
+):
+    from .cluster import parse_workers, run_sharded
+
+    # run_sharded takes one trial count and base seed per sweep, so group scenarios by them
+    groups: Dict[tuple, List[int]] = {}
+    for index, scenario in enumerate(scenarios):
+        trials = int(scenario.get("trials") or 1)
+        if trials > 1 and not results[index].get("error"):
+            groups.setdefault((trials, scenario.get("seed") or 0), []).append(index)
+
+    for (trials, seed), indexes in groups.items():
+        jobs = []
+        for index in indexes:
+            scenario = scenarios[index]
+            boss_data = files[scenario["boss"]]
+            team_data = files[scenario["team"]]
+            abilities = files.get(scenario["abilities"]) if scenario.get("abilities") else None
+            jobs.append(
+                {
+                    "boss": boss_data if isinstance(boss_data, dict) else boss_data[0],
+                    "team": team_data if isinstance(team_data, list) else [team_data],
+                    "abilities": abilities if isinstance(abilities, dict) else None,
+                    "rounds": int(scenario["rounds"]),
+                }
+            )
+        summaries = run_sharded(jobs, parse_workers(cluster), trials=trials, base_seed=seed, progress=progress)
+        for index, summary in zip(indexes, summaries):
+            results[index].update(
+                {"trials": trials, "mean_damage": summary["mean"], "ci_low": summary["ci_low"], "ci_high": summary["ci_high"]}
+            )
+        if progress:
+            progress(f"Cluster sweep finished: {len(jobs)} scenarios x {trials} trials")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all scenarios of a manifest on a worker pool")
+    parser.add_argument("manifest", help="Manifest file (yaml/json) with a 'scenarios' list")
+    parser.add_argument("--out", default="batch_results.csv", help="Consolidated results table (csv/xlsx/json/yaml)")
+    parser.add_argument("--log-dir", default=None, help="Optional directory for per-scenario battle logs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument(
+        "--cluster", default=None, help="Comma separated host:port list of src.cluster workers for the trial statistics"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    scenarios = load_manifest(args.manifest)
+    results = run_batch(scenarios, workers=args.workers, log_dir=args.log_dir, cluster=args.cluster)
+    save_data(results, args.out)
+    failures = sum(1 for row in results if row.get("error"))
+    print(f"{len(results)} scenarios finished in {time.perf_counter() - started:.2f} s ({failures} failed). Saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Shard Monte Carlo trials across worker daemons on one or more machines.
+
+Start one worker per core (or per machine)::
+
+    python -m src.cluster --port 9101
+    python -m src.cluster --port 9102
+
+and point the coordinator at them::
+
+    python -m src.simulator --boss ... --team ... --trials 100000 --workers 127.0.0.1:9101,127.0.0.1:9102
+
+A job is one (boss, team, abilities, rounds) configuration; a sweep is several jobs.
+Every job is split into shards of consecutive seeds. Workers keep parsed configs in
+memory (sent once per connection) and answer each shard with a compact aggregate
+(integer sums and a histogram) instead of battle logs, so the coordinator's merge is
+exact and matches a single-process run with the same seeds. Shards of a worker that
+fails or times out are put back in the queue and retried on the remaining workers; an
+error the worker reports for the job itself fails the whole run with its message.
+
+Connections use multiprocessing.connection, which unpickles whatever an authenticated
+peer sends, so the shared auth key (RAID_CLUSTER_AUTHKEY) is what keeps strangers from
+running code on a worker. There is no default key: a worker started without one
+generates a random key and prints it, and the coordinator refuses to connect without
+one. Only run workers on networks you trust.
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import queue
+import secrets
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Tuple
+
+from .montecarlo import aggregate, merge_aggregates, run_trials, summarize_aggregate
+
+AUTHKEY_ENV = "RAID_CLUSTER_AUTHKEY"
+DEFAULT_SHARD_SIZE = 200
+SHARD_TIMEOUT = 300.0
+
+
+def parse_workers(value: str) -> List[Tuple[str, int]]:
+    workers = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"Worker address must look like host:port, got {item!r}")
+        workers.append((host, int(port)))
+    return workers
+
+
+def cluster_authkey() -> bytes:
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise RuntimeError(f"Set {AUTHKEY_ENV} to the auth key printed by (or given to) the workers")
+    return key.encode("utf-8")
+
+
+def config_id(config: Dict[str, Any]) -> str:
+    return hashlib.blake2b(pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16).hexdigest()
+
+
+def _handle_connection(conn, configs: Dict[str, Dict[str, Any]], lock: threading.Lock):
+    with conn:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            op = message.get("op")
+            if op == "ping":
+                conn.send({"ok": True})
+            elif op == "load":
+                with lock:
+                    configs[message["config_id"]] = message["config"]
+                conn.send({"ok": True})
+            elif op == "run":
+                with lock:
+                    config = configs.get(message["config_id"])
+                if config is None:
+                    conn.send({"error": "unknown_config"})
+                    continue
+                try:
+                    samples = run_trials(
+                        config["boss"],
+                        config["team"],
+                        config.get("abilities"),
+                        rounds=config["rounds"],
+                        trials=message["trials"],
+                        base_seed=message["seed_start"],
+                    )
+                    conn.send({"ok": True, "aggregate": aggregate(samples, bin_width=message["bin_width"])})
+                except Exception as error:
+                    conn.send({"error": f"{type(error).__name__}: {error}"})
+            else:
+                conn.send({"error": f"unknown op {op!r}"})
+
+
+def serve(host: str, port: int, authkey: bytes):
+    configs: Dict[str, Dict[str, Any]] = {}
+    lock = threading.Lock()
+    with Listener((host, port), authkey=authkey) as listener:
+        print(f"Worker listening on {host}:{port}")
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError) as error:
+                # failed handshake (wrong auth key, port scan, ...): keep serving
+                print(f"Rejected connection: {error}")
+                continue
+            threading.Thread(target=_handle_connection, args=(conn, configs, lock), daemon=True).start()
+
+
+class WorkerError(RuntimeError):
+    """The worker is reachable but reported an error for the job (e.g. a bad config)."""
+
+
+class _WorkerLink:
+    def __init__(self, address: Tuple[str, int], timeout: float, authkey: bytes):
+        self.address = address
+        self.timeout = timeout
+        self.conn = Client(address, authkey=authkey)
+        self.loaded: set = set()
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.conn.send(message)
+        if not self.conn.poll(self.timeout):
+            raise TimeoutError(f"worker {self.address} did not answer within {self.timeout:.0f} s")
+        return self.conn.recv()
+
+    def run_shard(self, cid: str, config: Dict[str, Any], seed_start: int, trials: int, bin_width: int) -> Dict[str, Any]:
+        if cid not in self.loaded:
+            self.request({"op": "load", "config_id": cid, "config": config})
+            self.loaded.add(cid)
+        message = {"op": "run", "config_id": cid, "seed_start": seed_start, "trials": trials, "bin_width": bin_width}
+        reply = self.request(message)
+        if reply.get("error") == "unknown_config":
+            # worker restarted between shards
+            self.loaded.discard(cid)
+            return self.run_shard(cid, config, seed_start, trials, bin_width)
+        if "error" in reply:
+            raise WorkerError(f"worker {self.address[0]}:{self.address[1]}: {reply['error']}")
+        return reply["aggregate"]
+
+    def close(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+def run_sharded(
+    jobs: List[Dict[str, Any]],
+    workers: List[Tuple[str, int]],
+    trials: int,
+    base_seed: int = 0,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    bin_width: int = 1000,
+    max_attempts: int = 3,
+    timeout: float = SHARD_TIMEOUT,
+    progress=None,
+    authkey: Optional[bytes] = None,
+) -> List[Dict[str, Any]]:
+    """Run ``trials`` seeded trials of every job on the workers and merge the results.
+
+    Each job is a dict with ``boss``, ``team``, ``abilities`` and ``rounds``. Returns one
+    summary per job (mean, stdev, CI, min/max, histogram), identical to running
+    run_trials with the same seeds locally. ``authkey`` defaults to RAID_CLUSTER_AUTHKEY.
+    """
+    authkey = authkey or cluster_authkey()
+    if not workers:
+        raise ValueError("run_sharded needs at least one worker address")
+    if trials < 1 or shard_size < 1:
+        raise ValueError("trials and shard_size must be positive")
+    ids = [config_id(job) for job in jobs]
+    shards: "queue.Queue[Tuple[int, int, int, int]]" = queue.Queue()
+    total_shards = 0
+    for job_index in range(len(jobs)):
+        for offset in range(0, trials, shard_size):
+            shards.put((job_index, base_seed + offset, min(shard_size, trials - offset), 0))
+            total_shards += 1
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+    lock = threading.Lock()
+    state = {"done": 0, "alive": len(workers), "error": None, "last_drop": None}
+    finished = threading.Event()
+
+    def record(job_index: int, agg: Dict[str, Any]):
+        with lock:
+            current = results[job_index]
+            results[job_index] = agg if current is None else merge_aggregates(current, agg)
+            state["done"] += 1
+            if progress:
+                progress(f"[{state['done']}/{total_shards}] shards merged")
+            if state["done"] == total_shards:
+                finished.set()
+
+    def fail(message: str):
+        with lock:
+            state["error"] = state["error"] or message
+        finished.set()
+
+    def work(address: Tuple[str, int]):
+        link = None
+        try:
+            link = _WorkerLink(address, timeout, authkey)
+            while not finished.is_set():
+                try:
+                    shard = shards.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                job_index, seed_start, count, attempts = shard
+                try:
+                    agg = link.run_shard(ids[job_index], jobs[job_index], seed_start, count, bin_width)
+                except (EOFError, OSError) as error:
+                    # lost connection or timeout: retry the shard elsewhere and drop this worker
+                    if attempts + 1 >= max_attempts:
+                        fail(f"shard {seed_start}+{count} of job {job_index} failed {max_attempts} times: {error}")
+                    else:
+                        shards.put((job_index, seed_start, count, attempts + 1))
+                    raise
+                except Exception as error:
+                    # the worker answered with an error: every other worker would fail the same way
+                    fail(f"shard {seed_start}+{count} of job {job_index} failed: {error}")
+                    return
+                record(job_index, agg)
+        except Exception as error:
+            message = f"worker {address[0]}:{address[1]} dropped: {type(error).__name__}: {error}"
+            with lock:
+                state["last_drop"] = message
+            if progress:
+                progress(message)
+        finally:
+            if link is not None:
+                link.close()
+            with lock:
+                state["alive"] -= 1
+                no_workers_left = state["alive"] == 0
+            if no_workers_left and not finished.is_set():
+                fail(f"all workers failed, last: {state['last_drop']}")
+
+    threads = [threading.Thread(target=work, args=(address,), daemon=True) for address in workers]
+    for thread in threads:
+        thread.start()
+    finished.wait()
+    if state["error"]:
+        raise RuntimeError(state["error"])
+    return [summarize_aggregate(agg) for agg in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Monte Carlo worker daemon")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (0.0.0.0 for remote coordinators)")
+    parser.add_argument("--port", type=int, default=9101)
+    args = parser.parse_args()
+
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        key = secrets.token_urlsafe(24)
+        print(f"{AUTHKEY_ENV} is not set, generated a key for this worker.")
+        print(f"Use the same key for the coordinator and the other workers:\n\n    export {AUTHKEY_ENV}={key}\n")
+    serve(args.host, args.port, key.encode("utf-8"))
+
+
+if __name__ == "__main__":
+    main()
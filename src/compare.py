@@ -0,0 +1,175 @@
+"""A/B team comparison with common random numbers.
+
+Both teams fight with the same seeds, and every actor draws from its own seeded
+stream, so crit rolls line up turn by turn. The per-trial difference then cancels
+most of the crit noise and needs far fewer trials than two independent runs.
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from .io import save_data
+from .montecarlo import Z_95, load_inputs, normal_cdf, run_trials, summarize
+
+
+def compare_teams(
+    boss_data: Dict[str, Any],
+    team_a: List[Dict[str, Any]],
+    team_b: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    trials: int = 200,
+    base_seed: int = 0,
+    z: float = Z_95,
+) -> Dict[str, Any]:
+    damage_a = run_trials(boss_data, team_a, abilities, rounds=rounds, trials=trials, base_seed=base_seed)
+    damage_b = run_trials(boss_data, team_b, abilities, rounds=rounds, trials=trials, base_seed=base_seed)
+    return paired_summary(damage_a, damage_b, z=z)
+
+
+def paired_summary(damage_a: List[float], damage_b: List[float], z: float = Z_95) -> Dict[str, Any]:
+    a = summarize(damage_a, z=z)
+    b = summarize(damage_b, z=z)
+    diff = summarize([x - y for x, y in zip(damage_a, damage_b)], z=z)
+    # how many independent (unpaired) trials per team would give the same CI width
+    independent_var = a["stdev"] ** 2 + b["stdev"] ** 2
+    paired_var = diff["stdev"] ** 2
+    variance_reduction = independent_var / paired_var if paired_var else None
+    return {
+        "a": a,
+        "b": b,
+        "diff": diff,
+        "variance_reduction": variance_reduction,
+        "significant": diff["ci_low"] > 0 or diff["ci_high"] < 0,
+    }
+
+
+def rank_candidates(
+    boss_data: Dict[str, Any],
+    candidates: List[List[Dict[str, Any]]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    confidence: float = 0.95,
+    batch_size: int = 50,
+    max_trials: int = 5000,
+    time_budget: Optional[float] = None,
+    base_seed: int = 0,
+) -> Dict[str, Any]:
+    """Run paired batches until the leading candidate beats every other one with
+    probability ``confidence`` (normal approximation of the paired differences)."""
+    started = time.perf_counter()
+    samples: List[List[int]] = [[] for _ in candidates]
+    stop_reason = "max_trials"
+    ranking: List[Dict[str, Any]] = []
+    while len(samples[0]) < max_trials:
+        done = len(samples[0])
+        size = min(batch_size, max_trials - done)
+        for index, team_rows in enumerate(candidates):
+            samples[index].extend(
+                run_trials(boss_data, team_rows, abilities, rounds=rounds, trials=size, base_seed=base_seed + done)
+            )
+        ranking = _ranking(samples)
+        if len(candidates) < 2 or min(r["p_leader_better"] for r in ranking[1:]) >= confidence:
+            stop_reason = "target"
+            break
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            stop_reason = "time_budget"
+            break
+
+    return {
+        "ranking": ranking,
+        "trials": len(samples[0]),
+        "confidence": min((r["p_leader_better"] for r in ranking[1:]), default=1.0),
+        "converged": stop_reason == "target",
+        "stop_reason": stop_reason,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def _ranking(samples: List[List[int]]) -> List[Dict[str, Any]]:
+    means = [summarize(s)["mean"] for s in samples]
+    order = sorted(range(len(samples)), key=lambda i: -means[i])
+    leader = order[0]
+    ranking = []
+    for index in order:
+        row = {"candidate": index, "mean": means[index], "p_leader_better": 1.0}
+        if index != leader:
+            diff = summarize([x - y for x, y in zip(samples[leader], samples[index])])
+            se = diff["stdev"] / len(samples[index]) ** 0.5
+            row["p_leader_better"] = normal_cdf(diff["mean"] / se) if se else float(diff["mean"] > 0)
+        ranking.append(row)
+    return ranking
+
+
+def format_comparison(result: Dict[str, Any], label_a: str = "A", label_b: str = "B") -> str:
+    a, b, diff = result["a"], result["b"], result["diff"]
+    lines = [
+        f"{label_a}: mean {a['mean']:.0f} ± {a['half_width']:.0f} ({a['trials']} trials)",
+        f"{label_b}: mean {b['mean']:.0f} ± {b['half_width']:.0f} ({b['trials']} trials)",
+        f"{label_a} - {label_b}: {diff['mean']:.0f} [{diff['ci_low']:.0f}, {diff['ci_high']:.0f}]",
+    ]
+    if result["variance_reduction"]:
+        lines.append(f"Paired sampling variance reduction: {result['variance_reduction']:.1f}x")
+    lines.append("Difference is significant" if result["significant"] else "Difference is not significant")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two teams with common random numbers")
+    parser.add_argument("--boss", required=True, help="Path to boss file (yaml/json/csv/xlsx)")
+    parser.add_argument("--team-a", required=True, help="Path to first team file")
+    parser.add_argument("--team-b", required=True, help="Path to second team file")
+    parser.add_argument("--abilities", required=False, help="Path to boss abilities YAML", default=None)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--trials", type=int, default=200, help="Trials per team (upper limit in --confidence mode)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first trial")
+    parser.add_argument("--out", required=False, help="Optional JSON/YAML file for the full result", default=None)
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=None,
+        help="Adaptive ranking mode: run batches until the best team wins with this probability (e.g. 0.95)",
+    )
+    parser.add_argument("--candidate", action="append", default=[], help="Additional team file for ranking mode")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--time-budget", type=float, default=None, help="Stop ranking after this many seconds")
+    args = parser.parse_args()
+
+    boss_data, team_a, abilities = load_inputs(args.boss, args.team_a, args.abilities)
+    _, team_b, _ = load_inputs(args.boss, args.team_b)
+
+    if args.confidence is not None:
+        paths = [args.team_a, args.team_b, *args.candidate]
+        candidates = [team_a, team_b, *(load_inputs(args.boss, p)[1] for p in args.candidate)]
+        result = rank_candidates(
+            boss_data,
+            candidates,
+            abilities,
+            rounds=args.rounds,
+            confidence=args.confidence,
+            batch_size=args.batch_size,
+            max_trials=args.trials,
+            time_budget=args.time_budget,
+            base_seed=args.seed,
+        )
+        for place, row in enumerate(result["ranking"], start=1):
+            print(f"{place}. {paths[row['candidate']]}: mean {row['mean']:.0f} (P(leader better) {row['p_leader_better']:.3f})")
+        print(f"Used {result['trials']} trials per team, stopped by {result['stop_reason']}")
+        if args.out:
+            save_data(result, args.out)
+        return
+
+    result = compare_teams(
+        boss_data, team_a, team_b, abilities, rounds=args.rounds, trials=args.trials, base_seed=args.seed
+    )
+    print(format_comparison(result, label_a=args.team_a, label_b=args.team_b))
+    if args.out:
+        save_data(result, args.out)
+        print(f"Comparison saved to {args.out}")
+    else:
+        print(json.dumps(result["diff"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
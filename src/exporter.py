@@ -1,41 +1,106 @@
 import argparse
-from typing import List, Dict, Any, Union
-
-import pandas as pd
+import csv
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Union
 
 from .io import load_data
-from .onedrive import upload_file_to_onedrive
+
+EXPORT_FORMATS = ("xlsx", "csv", "json")
+EVENT_COLUMNS = ["round", "order_in_round", "boss_hp", "actor", "target", "damage", "ability"]
+
+
+def _round_event_rows(r: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rd = r.get("round")
+    boss_hp = r.get("boss_hp")
+    events = r.get("events", [])
+    if not events:
+        return [
+            {
+                "round": rd,
+                "order_in_round": None,
+                "boss_hp": boss_hp,
+                "actor": None,
+                "target": None,
+                "damage": None,
+                "ability": None,
+            }
+        ]
+    return [
+        {
+            "round": rd,
+            "order_in_round": i,
+            "boss_hp": boss_hp,
+            "actor": ev.get("actor"),
+            "target": ev.get("target"),
+            "damage": ev.get("dmg"),
+            "ability": ev.get("ability", "A1"),
+        }
+        for i, ev in enumerate(events, start=1)
+    ]
+
+
+def _round_timeline_rows(r: Dict[str, Any], round_index: int, global_turn: int) -> List[Dict[str, Any]]:
+    """Timeline rows of one round; ``global_turn`` is the number of turns in earlier rounds."""
+    rd = r.get("round")
+    boss_hp = r.get("boss_hp")
+    events = r.get("events", [])
+    if not events:
+        return [
+            {
+                "field": f"R{round_index}-T0",
+                "round": rd,
+                "round_index_0": round_index,
+                "turn": 0,
+                "turn_index_0": 0,
+                "global_turn_0": global_turn,
+                "actor": None,
+                "target": None,
+                "ability": None,
+                "damage": None,
+                "boss_hp_after_round": boss_hp,
+            }
+        ]
+    return [
+        {
+            "field": f"R{round_index}-T{i}",
+            "round": rd,
+            "round_index_0": round_index,
+            "turn": i + 1,
+            "turn_index_0": i,
+            "global_turn_0": global_turn + i,
+            "actor": ev.get("actor"),
+            "target": ev.get("target"),
+            "ability": ev.get("ability", "A1"),
+            "damage": ev.get("dmg"),
+            "boss_hp_after_round": boss_hp,
+        }
+        for i, ev in enumerate(events)
+    ]
+
+
+def _round_team_rows(r: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rd = r.get("round")
+    return [
+        {
+            "round": rd,
+            "member": t.get("name"),
+            "hp": t.get("hp"),
+            "alive": t.get("alive"),
+            "damage_done": t.get("damage_done"),
+        }
+        for t in r.get("team", [])
+    ]
 
 
 def _build_event_rows(log: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     rows = []
     for r in log:
-        rd = r.get("round")
-        boss_hp = r.get("boss_hp")
-        events = r.get("events", [])
-        if events:
-            for i, ev in enumerate(events, start=1):
-                rows.append({
-                    "round": rd,
-                    "order_in_round": i,
-                    "boss_hp": boss_hp,
-                    "actor": ev.get("actor"),
-                    "target": ev.get("target"),
-                    "damage": ev.get("dmg"),
-                    "ability": ev.get("ability", "A1"),
-                })
-        else:
-            rows.append(
-                {
-                    "round": rd,
-                    "order_in_round": None,
-                    "boss_hp": boss_hp,
-                    "actor": None,
-                    "target": None,
-                    "damage": None,
-                    "ability": None,
-                }
-            )
+        rows.extend(_round_event_rows(r))
     return rows
 
 
@@ -43,59 +108,15 @@ def _build_timeline_rows(log: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     rows = []
     global_turn = 0
     for round_index, r in enumerate(log):
-        rd = r.get("round")
-        boss_hp = r.get("boss_hp")
-        events = r.get("events", [])
-        if not events:
-            rows.append(
-                {
-                    "field": f"R{round_index}-T0",
-                    "round": rd,
-                    "round_index_0": round_index,
-                    "turn": 0,
-                    "turn_index_0": 0,
-                    "global_turn_0": global_turn,
-                    "actor": None,
-                    "target": None,
-                    "ability": None,
-                    "damage": None,
-                    "boss_hp_after_round": boss_hp,
-                }
-            )
-            continue
-
-        for i, ev in enumerate(events):
-            rows.append(
-                {
-                    "field": f"R{round_index}-T{i}",
-                    "round": rd,
-                    "round_index_0": round_index,
-                    "turn": i + 1,
-                    "turn_index_0": i,
-                    "global_turn_0": global_turn,
-                    "actor": ev.get("actor"),
-                    "target": ev.get("target"),
-                    "ability": ev.get("ability", "A1"),
-                    "damage": ev.get("dmg"),
-                    "boss_hp_after_round": boss_hp,
-                }
-            )
-            global_turn += 1
+        rows.extend(_round_timeline_rows(r, round_index, global_turn))
+        global_turn += len(r.get("events", []))
     return rows
 
 
 def _build_team_rows(log: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     rows = []
     for r in log:
-        rd = r.get("round")
-        for t in r.get("team", []):
-            rows.append({
-                "round": rd,
-                "member": t.get("name"),
-                "hp": t.get("hp"),
-                "alive": t.get("alive"),
-                "damage_done": t.get("damage_done"),
-            })
+        rows.extend(_round_team_rows(r))
     return rows
 
 
@@ -105,6 +126,8 @@ def export_log_to_excel(log_or_path: Union[str, List[Dict[str, Any]]], out_path:
     Sheets: Events, Timeline, Team
     The sheets will have bold headers and an autofilter enabled.
     """
+    import pandas as pd
+
     if isinstance(log_or_path, str):
         log = load_data(log_or_path)
     else:
@@ -159,6 +182,92 @@ def export_log_to_excel(log_or_path: Union[str, List[Dict[str, Any]]], out_path:
                 cell.font = Font(bold=True)
 
 
+def export_log_to_csv(log: List[Dict[str, Any]], out_path: str):
+    """Write the Events rows (one per action) as CSV."""
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EVENT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(_build_event_rows(log))
+
+
+def export_log(log: List[Dict[str, Any]], fmt: str, out_path: str):
+    if fmt == "xlsx":
+        export_log_to_excel(log, out_path)
+    elif fmt == "csv":
+        export_log_to_csv(log, out_path)
+    elif fmt == "json":
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(log, f, indent=2, ensure_ascii=False)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def log_digest(log: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(log, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    """Exports generated on first request and reused for identical logs.
+
+    Files live in ``cache_dir`` as ``battle_log-<digest>.<fmt>``; the exports of the
+    ``max_logs`` most recent logs are kept, older ones are deleted.
+    """
+
+    def __init__(self, cache_dir: str, max_logs: int = 16):
+        self.cache_dir = cache_dir
+        self.max_logs = max_logs
+        self._lock = threading.Lock()
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+
+    def path_for(self, digest: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"battle_log-{digest[:16]}.{fmt}")
+
+    def get(self, log: List[Dict[str, Any]], fmt: str, digest: str | None = None) -> str:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        digest = digest or log_digest(log)
+        path = self.path_for(digest, fmt)
+        with self._lock:
+            key_lock = self._key_locks.setdefault((digest, fmt), threading.Lock())
+        # one generator per (log, format); concurrent requests wait for it instead of redoing it
+        with key_lock:
+            if not os.path.exists(path):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp.{fmt}"
+                try:
+                    export_log(log, fmt, tmp)
+                    os.replace(tmp, path)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+        self._touch(digest)
+        return path
+
+    def get_many(self, log: List[Dict[str, Any]], formats: Iterable[str], digest: str | None = None) -> Dict[str, str]:
+        formats = list(dict.fromkeys(formats))
+        digest = digest or log_digest(log)
+        if len(formats) <= 1:
+            return {fmt: self.get(log, fmt, digest) for fmt in formats}
+        with ThreadPoolExecutor(max_workers=len(formats)) as pool:
+            paths = pool.map(lambda fmt: self.get(log, fmt, digest), formats)
+            return dict(zip(formats, paths))
+
+    def _touch(self, digest: str):
+        with self._lock:
+            self._recent[digest] = None
+            self._recent.move_to_end(digest)
+            while len(self._recent) > self.max_logs:
+                old, _ = self._recent.popitem(last=False)
+                for fmt in EXPORT_FORMATS:
+                    self._key_locks.pop((old, fmt), None)
+                    try:
+                        os.remove(self.path_for(old, fmt))
+                    except FileNotFoundError:
+                        pass
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--in", dest="infile", required=True, help="Input battle log (json/yaml/csv/xlsx)")
@@ -179,6 +288,8 @@ def main():
         if remote_path is None:
             import os
             remote_path = os.path.basename(args.outfile)
+        from .onedrive import upload_file_to_onedrive
+
         print("Uploading to OneDrive... follow the device-code instructions printed to complete authentication")
         try:
             url = upload_file_to_onedrive(args.outfile, remote_path, args.client_id, tenant_id=args.tenant)
@@ -1,30 +1,203 @@
+import csv
+import hashlib
+import io
 import json
+import math
 import os
-from typing import Any
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
 import yaml
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as YamlLoader
 
-def load_data(path: str) -> Any:
-    ext = os.path.splitext(path)[1].lower()
+# CSV files up to this size are parsed with the stdlib csv module instead of pandas
+SMALL_CSV_BYTES = 1024 * 1024
+CACHE_MAX_ENTRIES = 128
+SIDECAR_VERSION = 1
+# set to 1 to persist parsed results next to the input as a hidden .<name>.cache file
+SIDECAR_ENV = "RAID_IO_SIDECAR"
+SUPPORTED_EXTENSIONS = (".yml", ".yaml", ".json", ".csv", ".xls", ".xlsx")
+
+# abspath -> (mtime_ns, size, content digest, pickled result)
+_CACHE: "OrderedDict[str, Tuple[int, int, str, bytes]]" = OrderedDict()
+# the web app loads and saves from several request threads; parsing happens outside it
+_CACHE_LOCK = threading.Lock()
+
+
+# pandas.read_csv defaults for booleans and missing values
+CSV_TRUE_VALUES = ("True", "TRUE", "true")
+CSV_FALSE_VALUES = ("False", "FALSE", "false")
+CSV_NA_VALUES = frozenset(
+    (
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+        "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    )
+)
+
+
+def _coerce_csv_column(values: List[Optional[str]]) -> List[Any]:
+    """Type one column the way pandas.read_csv would: the whole column becomes bool, int,
+    float or str, and NA markers become NaN."""
+    present = [value for value in values if value is not None and value not in CSV_NA_VALUES]
+    missing = len(present) < len(values)
+
+    def convert(cast) -> List[Any]:
+        return [math.nan if value is None or value in CSV_NA_VALUES else cast(value) for value in values]
+
+    if present and all(value in CSV_TRUE_VALUES or value in CSV_FALSE_VALUES for value in present):
+        return convert(lambda value: value in CSV_TRUE_VALUES)
+    try:
+        # pandas turns an int column with gaps into floats
+        return convert(float if missing else int)
+    except ValueError:
+        pass
+    try:
+        return convert(float)
+    except ValueError:
+        return convert(str)
+
+
+def _read_small_csv(raw: bytes) -> List[Dict[str, Any]]:
+    reader = csv.DictReader(io.StringIO(raw.decode("utf-8-sig")))
+    rows = list(reader)
+    columns = {key: _coerce_csv_column([row.get(key) for row in rows]) for key in reader.fieldnames or []}
+    return [{key: columns[key][index] for key in columns} for index in range(len(rows))]
+
+
+def _parse(ext: str, raw: bytes) -> Any:
     if ext in (".yml", ".yaml"):
-        with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+        return yaml.load(raw, Loader=YamlLoader)
     if ext == ".json":
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return json.loads(raw)
     if ext == ".csv":
-        df = pd.read_csv(path)
+        if len(raw) <= SMALL_CSV_BYTES:
+            return _read_small_csv(raw)
+        import pandas as pd
+
+        df = pd.read_csv(io.BytesIO(raw))
         return df.to_dict(orient="records")
     if ext in (".xls", ".xlsx"):
-        df = pd.read_excel(path)
+        import pandas as pd
+
+        df = pd.read_excel(io.BytesIO(raw))
         return df.to_dict(orient="records")
     raise ValueError(f"Unsupported extension: {ext}")
 
 
+def _sidecar_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.cache")
+
+
+def _read_sidecar(path: str, digest: str) -> Optional[bytes]:
+    try:
+        with open(_sidecar_path(path), "rb") as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != SIDECAR_VERSION or entry.get("digest") != digest:
+        return None
+    return entry.get("blob")
+
+
+def _write_sidecar(path: str, digest: str, blob: bytes):
+    sidecar = _sidecar_path(path)
+    tmp = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": SIDECAR_VERSION, "digest": digest, "blob": blob}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, sidecar)
+    except OSError:
+        # the sidecar is only an optimization (e.g. read-only input directory)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _remember(key: str, stat: os.stat_result, digest: str, blob: bytes):
+    with _CACHE_LOCK:
+        _CACHE[key] = (stat.st_mtime_ns, stat.st_size, digest, blob)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > CACHE_MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+
+
+def clear_cache():
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def load_data(path: str, use_cache: bool = True, persist: Optional[bool] = None) -> Any:
+    """Load yaml/json/csv/xlsx data.
+
+    Parsed results are cached per file (mtime/size, then content hash), and every call
+    returns a fresh copy, so callers may mutate the result. With ``persist`` (default:
+    the RAID_IO_SIDECAR environment variable) the parsed result is also stored in a
+    binary sidecar file so other processes skip parsing too.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported extension: {ext}")
+    if not use_cache:
+        with open(path, "rb") as f:
+            return _parse(ext, f.read())
+
+    if persist is None:
+        persist = os.environ.get(SIDECAR_ENV) == "1"
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+        fresh = cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size
+        if fresh:
+            _CACHE.move_to_end(key)
+    if fresh:
+        return pickle.loads(cached[3])
+
+    with open(key, "rb") as f:
+        raw = f.read()
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    if cached and cached[2] == digest:
+        _remember(key, stat, digest, cached[3])
+        return pickle.loads(cached[3])
+
+    blob = _read_sidecar(key, digest) if persist else None
+    if blob is not None:
+        _remember(key, stat, digest, blob)
+        return pickle.loads(blob)
+
+    data = _parse(ext, raw)
+    blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    _remember(key, stat, digest, blob)
+    if persist:
+        _write_sidecar(key, digest, blob)
+    return data
+
+
 def save_data(data: Any, path: str):
+    """Write yaml/json/csv/xlsx data.
+
+    The file is written under a temporary name and then renamed, so concurrent readers
+    (e.g. web requests) see either the old or the new content, never a partial file.
+    """
+    with _CACHE_LOCK:
+        _CACHE.pop(os.path.abspath(path), None)
     ext = os.path.splitext(path)[1].lower()
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp{ext}"
+    try:
+        _write(data, tmp, ext)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write(data: Any, path: str, ext: str):
     if ext in (".yml", ".yaml"):
         with open(path, "w", encoding="utf-8") as f:
             yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
@@ -33,7 +206,9 @@ def save_data(data: Any, path: str):
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         return
-    # For CSV / Excel try to build a dataframe
+    # For CSV / Excel try to build a dataframe; pandas is only imported for these formats
+    import pandas as pd
+
     try:
         df = pd.json_normalize(data)
     except Exception:
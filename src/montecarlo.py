@@ -0,0 +1,247 @@
+"""Repeated-fight helpers: run many seeded simulations and summarize total damage."""
+import math
+import statistics
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .io import load_data
+from .models import Boss, TeamMember
+from .simulator import build_boss, build_team, run_simulation
+
+Z_95 = 1.959963984540054
+
+
+def load_inputs(
+    boss_path: str,
+    team_path: str,
+    abilities_path: Optional[str] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    boss_data = load_data(boss_path)
+    team_data = load_data(team_path)
+    abilities = load_data(abilities_path) if abilities_path else None
+    return (
+        boss_data if isinstance(boss_data, dict) else boss_data[0],
+        team_data if isinstance(team_data, list) else [team_data],
+        abilities if isinstance(abilities, dict) else None,
+    )
+
+
+def build_fight(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+) -> Tuple[Boss, List[TeamMember]]:
+    boss = build_boss(boss_data)
+    if isinstance(abilities, dict):
+        boss.abilities = {**boss.abilities, **abilities}
+    team = build_team(team_rows)
+    return boss, team
+
+
+def total_team_damage(log: List[Dict[str, Any]]) -> int:
+    return sum(int(t.get("damage_done", 0)) for r in log for t in r.get("team", []))
+
+
+def simulate_total_damage(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    seed: Optional[int] = None,
+) -> int:
+    # run_simulation mutates hp/alive, so every trial starts from freshly built characters
+    boss, team = build_fight(boss_data, team_rows, abilities)
+    return total_team_damage(run_simulation(boss, team, rounds=rounds, seed=seed))
+
+
+def run_trials(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    trials: int = 100,
+    base_seed: int = 0,
+) -> List[int]:
+    return [
+        simulate_total_damage(boss_data, team_rows, abilities, rounds=rounds, seed=base_seed + i)
+        for i in range(trials)
+    ]
+
+
+def summarize(samples: List[float], z: float = Z_95) -> Dict[str, Any]:
+    n = len(samples)
+    mean = statistics.fmean(samples) if n else 0.0
+    stdev = statistics.stdev(samples) if n > 1 else 0.0
+    half_width = z * stdev / math.sqrt(n) if n > 1 else math.inf
+    return {
+        "trials": n,
+        "mean": mean,
+        "stdev": stdev,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "half_width": half_width,
+        "rel_half_width": half_width / abs(mean) if mean else math.inf,
+    }
+
+
+def normal_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def run_adaptive_trials(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    target_rel_half_width: float = 0.01,
+    batch_size: int = 50,
+    max_trials: int = 10000,
+    time_budget: Optional[float] = None,
+    base_seed: int = 0,
+    z: float = Z_95,
+) -> Dict[str, Any]:
+    """Run batches of trials until the CI half-width on mean damage is small enough.
+
+    Stops when ``half_width / mean <= target_rel_half_width``, when ``max_trials`` is
+    reached or when ``time_budget`` seconds have elapsed, whichever comes first.
+    """
+    summary: Dict[str, Any] = {}
+    for summary in iter_adaptive_trials(
+        boss_data,
+        team_rows,
+        abilities,
+        rounds=rounds,
+        target_rel_half_width=target_rel_half_width,
+        batch_size=batch_size,
+        max_trials=max_trials,
+        time_budget=time_budget,
+        base_seed=base_seed,
+        z=z,
+    ):
+        pass
+    return summary
+
+
+def iter_adaptive_trials(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    target_rel_half_width: float = 0.01,
+    batch_size: int = 50,
+    max_trials: int = 10000,
+    time_budget: Optional[float] = None,
+    base_seed: int = 0,
+    z: float = Z_95,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the running summary after every batch; the last one has ``stop_reason`` set."""
+    started = time.perf_counter()
+    samples: List[int] = []
+    stop_reason = "max_trials"
+    while len(samples) < max_trials:
+        size = min(batch_size, max_trials - len(samples))
+        samples.extend(
+            run_trials(boss_data, team_rows, abilities, rounds=rounds, trials=size, base_seed=base_seed + len(samples))
+        )
+        summary = summarize(samples, z=z)
+        if summary["rel_half_width"] <= target_rel_half_width:
+            stop_reason = "target"
+            break
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            stop_reason = "time_budget"
+            break
+        if len(samples) < max_trials:
+            yield {**summary, "converged": False, "stop_reason": None, "elapsed": time.perf_counter() - started}
+
+    summary = summarize(samples, z=z)
+    summary["converged"] = stop_reason == "target"
+    summary["stop_reason"] = stop_reason
+    summary["elapsed"] = time.perf_counter() - started
+    yield summary
+
+
+def aggregate(samples: List[int], bin_width: int = 1000) -> Dict[str, Any]:
+    """Compact, exactly mergeable statistics of integer damage samples."""
+    histogram: Dict[int, int] = {}
+    for value in samples:
+        bucket = value // bin_width * bin_width
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    return {
+        "n": len(samples),
+        "sum": sum(samples),
+        "sumsq": sum(value * value for value in samples),
+        "min": min(samples) if samples else None,
+        "max": max(samples) if samples else None,
+        "bin_width": bin_width,
+        "histogram": histogram,
+    }
+
+
+def merge_aggregates(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    if a["bin_width"] != b["bin_width"]:
+        raise ValueError("Cannot merge histograms with different bin widths")
+    histogram = dict(a["histogram"])
+    for bucket, count in b["histogram"].items():
+        histogram[bucket] = histogram.get(bucket, 0) + count
+    mins = [v for v in (a["min"], b["min"]) if v is not None]
+    maxes = [v for v in (a["max"], b["max"]) if v is not None]
+    return {
+        "n": a["n"] + b["n"],
+        "sum": a["sum"] + b["sum"],
+        "sumsq": a["sumsq"] + b["sumsq"],
+        "min": min(mins) if mins else None,
+        "max": max(maxes) if maxes else None,
+        "bin_width": a["bin_width"],
+        "histogram": histogram,
+    }
+
+
+def summarize_aggregate(agg: Dict[str, Any], z: float = Z_95) -> Dict[str, Any]:
+    n = agg["n"]
+    mean = agg["sum"] / n if n else 0.0
+    # integer sums keep the merged variance exact regardless of how trials were sharded
+    variance = (n * agg["sumsq"] - agg["sum"] ** 2) / (n * (n - 1)) if n > 1 else 0.0
+    stdev = math.sqrt(max(0.0, variance))
+    half_width = z * stdev / math.sqrt(n) if n > 1 else math.inf
+    return {
+        "trials": n,
+        "mean": mean,
+        "stdev": stdev,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "half_width": half_width,
+        "rel_half_width": half_width / abs(mean) if mean else math.inf,
+        "min": agg["min"],
+        "max": agg["max"],
+        "histogram": dict(sorted(agg["histogram"].items())),
+    }
+
+
+def simulate_summary(
+    boss_data: Dict[str, Any],
+    team_rows: List[Dict[str, Any]],
+    abilities: Optional[Dict[str, Any]] = None,
+    rounds: int = 50,
+    seed: Optional[int] = None,
+    trials: int = 1,
+) -> Dict[str, Any]:
+    """One fight reduced to its summary, plus trial statistics when ``trials > 1``."""
+    boss, team = build_fight(boss_data, team_rows, abilities)
+    log = run_simulation(boss, team, rounds=rounds, seed=seed)
+    damage: Dict[str, int] = {member.name: 0 for member in team}
+    for r in log:
+        for t in r.get("team", []):
+            damage[t["name"]] = damage.get(t["name"], 0) + int(t.get("damage_done", 0))
+    result: Dict[str, Any] = {
+        "rounds_played": len(log),
+        "total_damage": sum(damage.values()),
+        "boss_hp_end": boss.hp,
+        "team": [
+            {"name": member.name, "hp": member.hp, "alive": member.alive, "damage_done": damage[member.name]}
+            for member in team
+        ],
+    }
+    if trials > 1:
+        summary = summarize(run_trials(boss_data, team_rows, abilities, rounds=rounds, trials=trials, base_seed=seed or 0))
+        result["trials"] = {key: summary[key] for key in ("trials", "mean", "stdev", "ci_low", "ci_high", "half_width")}
+    return result
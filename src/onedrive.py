@@ -7,32 +7,133 @@ Usage notes:
 
 This module uploads a local file to the user's OneDrive root (or subpath) and returns
 the shareable web link which can be opened in Excel Online.
+
+Tokens are kept in a serialized MSAL cache on disk (``RAID_ONEDRIVE_CACHE`` directory,
+default ``~/.raid-simulator``), so the device-code login is only needed once; later
+calls refresh silently. All Graph calls share one keep-alive ``requests.Session`` with
+retry/backoff, and share links are remembered per item, so a repeat upload of the same
+file costs a single PUT. ``RAID_GRAPH_URL`` points the module at another Graph endpoint,
+e.g. a local stand-in server for tests.
 """
 import json
 import os
-from typing import Optional
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
 
-import msal
-import requests
+if TYPE_CHECKING:
+    import msal
+    import requests
 
 
 DEFAULT_SCOPES = ["Files.ReadWrite.All", "User.Read"]
+GRAPH_URL = os.environ.get("RAID_GRAPH_URL", "https://graph.microsoft.com/v1.0").rstrip("/")
+DEFAULT_CACHE_DIR = os.environ.get("RAID_ONEDRIVE_CACHE", os.path.join(os.path.expanduser("~"), ".raid-simulator"))
+TOKEN_CACHE_FILE = "msal_token_cache.bin"
+SHARE_LINKS_FILE = "share_links.json"
+# Graph rejects simple /content uploads above 4 MB; larger files use an upload session
+SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024
+# upload session chunks must be a multiple of 320 KiB
+CHUNK_SIZE = 10 * 320 * 1024
+
+_LOCK = threading.RLock()
+_SESSION: Optional["requests.Session"] = None
+_APPS: Dict[tuple, tuple] = {}
+_SHARE_LINKS: Dict[str, Dict[str, str]] = {}
+
+
+def get_session() -> "requests.Session":
+    """Shared keep-alive session; retries throttling and transient server errors with backoff."""
+    global _SESSION
+    with _LOCK:
+        if _SESSION is None:
+            # msal/requests are imported on first use so importing this module stays cheap
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"GET", "PUT", "POST"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def _cache_path(cache_dir: Optional[str], name: str) -> str:
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, name)
+
+
+def _write_private(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
 
 
-def acquire_token_device_flow(client_id: str, tenant_id: Optional[str] = None, scopes=None) -> str:
-    import json
+def _authority(tenant_id: Optional[str]) -> str:
+    return f"https://login.microsoftonline.com/{tenant_id}" if tenant_id else "https://login.microsoftonline.com/common"
+
+
+def _get_public_client(client_id: str, tenant_id: Optional[str], cache_dir: Optional[str]):
+    authority = _authority(tenant_id)
+    key = (client_id, authority, cache_dir or DEFAULT_CACHE_DIR)
+    with _LOCK:
+        if key not in _APPS:
+            import msal
+
+            cache = msal.SerializableTokenCache()
+            path = _cache_path(cache_dir, TOKEN_CACHE_FILE)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    cache.deserialize(f.read())
+            app = msal.PublicClientApplication(
+                client_id=client_id, authority=authority, token_cache=cache, http_client=get_session()
+            )
+            # token acquisition has its own lock: a device-code login can take minutes and
+            # must not block the session and share-link helpers that use _LOCK
+            _APPS[key] = (app, cache, threading.Lock())
+        return _APPS[key]
+
+
+def _save_token_cache(cache: "msal.SerializableTokenCache", cache_dir: Optional[str]):
+    if cache.has_state_changed:
+        _write_private(_cache_path(cache_dir, TOKEN_CACHE_FILE), cache.serialize())
+
+
+def acquire_token_device_flow(
+    client_id: str, tenant_id: Optional[str] = None, scopes=None, cache_dir: Optional[str] = None
+) -> str:
+    """Return an access token, silently from the token cache when possible.
+
+    Falls back to the interactive device-code flow only when no cached account can be
+    refreshed.
+    """
     scopes = scopes or DEFAULT_SCOPES
-    authority = f"https://login.microsoftonline.com/{tenant_id}" if tenant_id else "https://login.microsoftonline.com/common"
-    print(f"[DEBUG] Using authority: {authority}")
-    print(f"[DEBUG] Using scopes: {scopes}")
-    app = msal.PublicClientApplication(client_id=client_id, authority=authority)
-    flow = app.initiate_device_flow(scopes=scopes)
-    print(f"[DEBUG] Device flow response: {json.dumps(flow, indent=2)}")
-    if "user_code" not in flow:
-        raise RuntimeError("Failed to start device flow: %s" % flow)
-    print(flow["message"])  # instructs the user to visit URL and enter code
-    result = app.acquire_token_by_device_flow(flow)
-    print(f"[DEBUG] Token acquisition result: {json.dumps(result, indent=2)}")
+    app, cache, token_lock = _get_public_client(client_id, tenant_id, cache_dir)
+    with token_lock:
+        for account in app.get_accounts():
+            result = app.acquire_token_silent(scopes, account=account)
+            if result and "access_token" in result:
+                _save_token_cache(cache, cache_dir)
+                return result["access_token"]
+
+        print(f"[DEBUG] Using authority: {_authority(tenant_id)}")
+        print(f"[DEBUG] Using scopes: {scopes}")
+        flow = app.initiate_device_flow(scopes=scopes)
+        if "user_code" not in flow:
+            raise RuntimeError("Failed to start device flow: %s" % flow)
+        print(flow["message"])  # instructs the user to visit URL and enter code
+        result = app.acquire_token_by_device_flow(flow)
+        _save_token_cache(cache, cache_dir)
     if "access_token" in result:
         return result["access_token"]
     raise RuntimeError("Failed to acquire token: %s" % json.dumps(result, indent=2))
@@ -42,33 +143,140 @@ def upload_file(access_token: str, local_path: str, remote_path: str) -> dict:
     """Upload file and return JSON response from Graph for the created item.
 
     remote_path is a path relative to OneDrive root, e.g. 'Raid/battle_log.xlsx'.
+    Files above SIMPLE_UPLOAD_LIMIT go through a resumable upload session.
     """
-    url = f"https://graph.microsoft.com/v1.0/me/drive/root:/{remote_path}:/content"
+    if os.path.getsize(local_path) > SIMPLE_UPLOAD_LIMIT:
+        return upload_large_file(access_token, local_path, remote_path)
+    url = f"{GRAPH_URL}/me/drive/root:/{remote_path}:/content"
     headers = {"Authorization": f"Bearer {access_token}"}
+    # read into memory so a retried PUT resends the full body
     with open(local_path, "rb") as f:
-        resp = requests.put(url, headers=headers, data=f)
+        data = f.read()
+    resp = get_session().put(url, headers=headers, data=data)
     resp.raise_for_status()
     return resp.json()
 
 
+def create_upload_session(access_token: str, remote_path: str) -> str:
+    url = f"{GRAPH_URL}/me/drive/root:/{remote_path}:/createUploadSession"
+    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+    body = {"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+    resp = get_session().post(url, headers=headers, json=body)
+    resp.raise_for_status()
+    return resp.json()["uploadUrl"]
+
+
+def _next_expected_offset(upload_url: str) -> int:
+    resp = get_session().get(upload_url)
+    resp.raise_for_status()
+    ranges = resp.json().get("nextExpectedRanges") or ["0-"]
+    return int(ranges[0].split("-")[0])
+
+
+def upload_large_file(
+    access_token: str,
+    local_path: str,
+    remote_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    max_failures: int = 5,
+) -> dict:
+    """Upload through a Graph upload session in fixed-size chunks.
+
+    After a failed chunk the session is asked for its next expected range and the
+    upload continues from the last acknowledged byte instead of starting over.
+    """
+    import requests
+
+    total = os.path.getsize(local_path)
+    upload_url = create_upload_session(access_token, remote_path)
+    offset = 0
+    failures = 0
+    resync = False
+    with open(local_path, "rb") as f:
+        while True:
+            try:
+                if resync:
+                    # after a failure (e.g. a 416 because the chunk was stored but the
+                    # response got lost) continue from the session's acknowledged offset
+                    offset = _next_expected_offset(upload_url)
+                    resync = False
+                f.seek(offset)
+                chunk = f.read(chunk_size)
+                end = offset + len(chunk) - 1
+                # the upload URL is pre-authenticated, Graph rejects an Authorization header here
+                headers = {"Content-Length": str(len(chunk)), "Content-Range": f"bytes {offset}-{end}/{total}"}
+                resp = get_session().put(upload_url, headers=headers, data=chunk)
+                if resp.status_code in (200, 201):
+                    return resp.json()
+                if resp.status_code == 202:
+                    ranges = resp.json().get("nextExpectedRanges") or [f"{end + 1}-"]
+                    offset = int(ranges[0].split("-")[0])
+                    failures = 0
+                    continue
+                resp.raise_for_status()
+                # only reached for 2xx/3xx codes that are not part of the upload session protocol
+                raise requests.HTTPError(f"Unexpected upload session response: {resp.status_code}", response=resp)
+            except requests.RequestException:
+                failures += 1
+                if failures >= max_failures:
+                    raise
+                time.sleep(min(30.0, 0.5 * 2 ** (failures - 1)))
+                resync = True
+
+
 def create_share_link(access_token: str, item_id: str, link_type: str = "view") -> dict:
-    url = f"https://graph.microsoft.com/v1.0/me/drive/items/{item_id}/createLink"
+    url = f"{GRAPH_URL}/me/drive/items/{item_id}/createLink"
     headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
     body = {"type": link_type}
-    resp = requests.post(url, headers=headers, json=body)
+    resp = get_session().post(url, headers=headers, json=body)
     resp.raise_for_status()
     return resp.json()
 
 
-def upload_file_to_onedrive(local_path: str, remote_path: str, client_id: str, tenant_id: Optional[str] = None) -> str:
+def _load_share_links(cache_dir: Optional[str]) -> Dict[str, str]:
+    key = cache_dir or DEFAULT_CACHE_DIR
+    if key not in _SHARE_LINKS:
+        path = _cache_path(cache_dir, SHARE_LINKS_FILE)
+        links: Dict[str, str] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    links = json.load(f)
+            except (OSError, ValueError):
+                links = {}
+        _SHARE_LINKS[key] = links
+    return _SHARE_LINKS[key]
+
+
+def get_share_url(access_token: str, item_id: str, link_type: str = "view", cache_dir: Optional[str] = None) -> str:
+    """Share link of an item; createLink is only called the first time an item is shared."""
+    link_key = f"{item_id}:{link_type}"
+    with _LOCK:
+        links = _load_share_links(cache_dir)
+        if links.get(link_key):
+            return links[link_key]
+    web_url = create_share_link(access_token, item_id, link_type=link_type).get("link", {}).get("webUrl")
+    if web_url:
+        with _LOCK:
+            links[link_key] = web_url
+            _write_private(_cache_path(cache_dir, SHARE_LINKS_FILE), json.dumps(links, indent=2))
+    return web_url
+
+
+def upload_file_to_onedrive(
+    local_path: str,
+    remote_path: str,
+    client_id: str,
+    tenant_id: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> str:
     """High-level helper: authenticate, upload, create share link, return webUrl."""
-    token = acquire_token_device_flow(client_id, tenant_id)
+    token = acquire_token_device_flow(client_id, tenant_id, cache_dir=cache_dir)
     item = upload_file(token, local_path, remote_path)
     item_id = item.get("id")
     if not item_id:
         raise RuntimeError("Upload succeeded but no item id returned")
-    link = create_share_link(token, item_id, link_type="view")
-    return link.get("link", {}).get("webUrl")
+    return get_share_url(token, item_id, link_type="view", cache_dir=cache_dir)
 
 
 if __name__ == "__main__":
@@ -79,10 +287,11 @@ if __name__ == "__main__":
     parser.add_argument("--file", required=True, help="Local file to upload")
     parser.add_argument("--remote", required=False, help="Remote path in OneDrive", default=None)
     parser.add_argument("--tenant", required=False, help="Tenant id (optional)")
+    parser.add_argument("--cache-dir", required=False, help="Token/share-link cache directory", default=None)
     args = parser.parse_args()
 
     local = args.file
     remote = args.remote or os.path.basename(local)
-    url = upload_file_to_onedrive(local, remote, args.client_id, tenant_id=args.tenant)
+    url = upload_file_to_onedrive(local, remote, args.client_id, tenant_id=args.tenant, cache_dir=args.cache_dir)
     print("File uploaded. Open in Excel Online:")
     print(url)
@@ -1,7 +1,7 @@
 import argparse
 import json
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 
 from .models import Boss, TeamMember, Character
 from .io import load_data, save_data
@@ -86,11 +86,11 @@ def build_team(rows: List[Dict[str, Any]]) -> List[TeamMember]:
     return team
 
 
-def calc_damage(attacker: Character, defender: Character, extra_multiplier=1.0) -> int:
+def calc_damage(attacker: Character, defender: Character, extra_multiplier=1.0, rng=None) -> int:
     base = attacker.atk * attacker.skill_multiplier * extra_multiplier
     reduction = defender.defense / (defender.defense + 1000) if defender.defense else 0
     dmg = max(1, int(base * (1 - reduction)))
-    if random.random() < attacker.crit_rate:
+    if (rng or random).random() < attacker.crit_rate:
         dmg = int(dmg * attacker.crit_damage)
     return dmg
 
@@ -121,23 +121,45 @@ def choose_ability(member: TeamMember, cooldown_state: Dict[str, int]) -> str:
     return "A1"
 
 
-def run_simulation(boss: Boss, team: List[TeamMember], rounds=50) -> List[Dict[str, Any]]:
-    log: List[Dict[str, Any]] = []
+def action_order(boss: Boss, team: List[TeamMember]) -> List[Character]:
+    # build action order by speed (team members + boss); ties keep team order, then the boss
+    actors = [*team, boss]
+    actors = [a for a in actors if a.alive]
+    actors.sort(key=lambda x: x.speed, reverse=True)
+    return actors
+
+
+def actor_stream(seed: int, name: str) -> random.Random:
+    """Per-actor stream: fights sharing a seed see the same rolls for each hero."""
+    return random.Random(f"{seed}:{name}")
+
+
+def run_simulation(boss: Boss, team: List[TeamMember], rounds=50, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    return list(iter_simulation(boss, team, rounds=rounds, seed=seed))
+
+
+def iter_simulation(boss: Boss, team: List[TeamMember], rounds=50, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield each round summary as soon as the round is fought (see run_simulation)."""
     boss_cycle = ["AOE1", "AOE2", "STUN"]
     cooldowns: Dict[str, Dict[str, int]] = {
         member.name: {"A1": 0, "A2": 0, "A3": 0, "A4": 0}
         for member in team
     }
+    streams: Dict[str, Any] = {}
+
+    def rng_for(actor: Character):
+        if seed is None:
+            return random
+        if actor.name not in streams:
+            streams[actor.name] = actor_stream(seed, actor.name)
+        return streams[actor.name]
 
     for r in range(1, rounds + 1):
         round_summary = {"round": r, "boss_hp": boss.hp, "events": []}
 
         apply_boss_abilities_on_round_start(boss, r)
 
-        # build action order by speed (team members + boss)
-        actors = [*team, boss]
-        actors = [a for a in actors if a.alive]
-        actors.sort(key=lambda x: x.speed, reverse=True)
+        actors = action_order(boss, team)
 
         # per-round per-character stats
         per_char = {a.name: {"hp": a.hp, "damage_done": 0, "alive": a.alive} for a in actors}
@@ -150,10 +172,11 @@ def run_simulation(boss: Boss, team: List[TeamMember], rounds=50) -> List[Dict[s
                 targets = [t for t in team if t.alive]
                 if not targets:
                     break
-                target = random.choice(targets)
+                boss_rng = rng_for(actor)
+                target = boss_rng.choice(targets)
                 boss_ability = boss_cycle[(r - 1) % len(boss_cycle)]
                 # simple damage calculation, check abilities that modify boss damage
-                dmg = calc_damage(actor, target)
+                dmg = calc_damage(actor, target, rng=boss_rng)
                 target.take_damage(dmg)
                 per_char[actor.name]["damage_done"] = per_char[actor.name].get("damage_done", 0) + dmg
                 round_summary["events"].append(
@@ -176,7 +199,7 @@ def run_simulation(boss: Boss, team: List[TeamMember], rounds=50) -> List[Dict[s
                 ability_name = choose_ability(actor, member_cooldowns)
                 ability_cfg = actor.abilities.get(ability_name, {}) if isinstance(actor.abilities, dict) else {}
                 ability_multiplier = float(ability_cfg.get("multiplier", actor.skill_multiplier))
-                dmg = calc_damage(actor, boss, extra_multiplier=ability_multiplier)
+                dmg = calc_damage(actor, boss, extra_multiplier=ability_multiplier, rng=rng_for(actor))
 
                 configured_cooldown = int(ability_cfg.get("cooldown", 0))
                 member_cooldowns[ability_name] = max(0, configured_cooldown)
@@ -205,13 +228,11 @@ def run_simulation(boss: Boss, team: List[TeamMember], rounds=50) -> List[Dict[s
             {"name": t.name, "hp": t.hp, "alive": t.alive, "damage_done": per_char.get(t.name, {}).get("damage_done", 0)}
             for t in team
         ]
-        log.append(round_summary)
+        yield round_summary
         # stop early if boss dead or all team dead
         if (not boss.extra.get("infinite_hp", False) and not boss.alive) or not any(t.alive for t in team):
             break
 
-    return log
-
 
 def main():
     parser = argparse.ArgumentParser()
@@ -220,6 +241,22 @@ def main():
     parser.add_argument("--abilities", required=False, help="Path to boss abilities YAML", default=None)
     parser.add_argument("--out", required=False, help="Output file path", default="battle_log.json")
     parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible per-actor random streams")
+    parser.add_argument(
+        "--target-rel-ci",
+        type=float,
+        default=None,
+        help="Also run trial batches until the 95%% CI half-width of mean total damage is below this fraction (e.g. 0.01)",
+    )
+    parser.add_argument("--max-trials", type=int, default=10000, help="Trial limit for --target-rel-ci")
+    parser.add_argument("--time-budget", type=float, default=None, help="Time limit in seconds for --target-rel-ci")
+    parser.add_argument(
+        "--workers",
+        default=None,
+        help="Comma separated host:port list of src.cluster workers; runs --trials seeded trials on them",
+    )
+    parser.add_argument("--trials", type=int, default=1000, help="Trial count for --workers")
+    parser.add_argument("--shard-size", type=int, default=200, help="Trials per shard for --workers")
     args = parser.parse_args()
 
     boss_data = load_data(args.boss)
@@ -233,11 +270,51 @@ def main():
         if isinstance(ab, dict):
             boss.abilities.update(ab)
 
-    log = run_simulation(boss, team, rounds=args.rounds)
+    log = run_simulation(boss, team, rounds=args.rounds, seed=args.seed)
 
     save_data(log, args.out)
     print(f"Simulation finished. Saved to {args.out}")
 
+    if args.target_rel_ci:
+        from .montecarlo import run_adaptive_trials
+
+        summary = run_adaptive_trials(
+            boss_data if isinstance(boss_data, dict) else boss_data[0],
+            team_data if isinstance(team_data, list) else [team_data],
+            boss.abilities,
+            rounds=args.rounds,
+            target_rel_half_width=args.target_rel_ci,
+            max_trials=args.max_trials,
+            time_budget=args.time_budget,
+            base_seed=args.seed or 0,
+        )
+        print(
+            f"Mean total damage: {summary['mean']:.0f} ± {summary['half_width']:.0f} "
+            f"({summary['trials']} trials, stopped by {summary['stop_reason']})"
+        )
+
+    if args.workers:
+        from .cluster import parse_workers, run_sharded
+
+        job = {
+            "boss": boss_data if isinstance(boss_data, dict) else boss_data[0],
+            "team": team_data if isinstance(team_data, list) else [team_data],
+            "abilities": boss.abilities,
+            "rounds": args.rounds,
+        }
+        summary = run_sharded(
+            [job],
+            parse_workers(args.workers),
+            trials=args.trials,
+            base_seed=args.seed or 0,
+            shard_size=args.shard_size,
+            progress=print,
+        )[0]
+        print(
+            f"Mean total damage: {summary['mean']:.0f} ± {summary['half_width']:.0f} "
+            f"(stdev {summary['stdev']:.0f}, min {summary['min']}, max {summary['max']}, {summary['trials']} trials)"
+        )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,257 @@
+"""Speed-tune solver: find hero speeds that satisfy desired turn-order constraints.
+
+A constraint ``Seeker < BOSS @ AOE1`` means Seeker must act before the boss on its
+AOE1 turn. The scheduler orders actors by speed once per round, and ties keep the team
+order with the boss last (see simulator.action_order), so every constraint becomes a
+difference constraint ``speed_a - speed_b >= 0 or 1``. Interval propagation over those
+(all-pairs shortest paths) gives the feasible speed interval of every hero directly,
+without simulating. The suggested tune minimizes the total change sum(|new - old speed|)
+over the same constraints; that problem is the dual of a min-cost circulation, which is
+solved by cancelling negative cycles, and the optimal speeds are the shortest-path
+distances in the final residual graph. Because the order is the
+same every round, constraints that differ per boss turn (``AOE1`` vs ``STUN``) can only
+be satisfied together if they agree; otherwise the solver reports them as infeasible.
+"""
+import argparse
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Boss, TeamMember
+from .montecarlo import load_inputs
+from .simulator import action_order, build_boss, build_team
+
+BOSS_ALIAS = "BOSS"
+BOSS_TURNS = ("AOE1", "AOE2", "STUN")
+MIN_SPEED = 1
+MAX_SPEED = 999
+
+
+def parse_constraint(text: str) -> Dict[str, Any]:
+    """Parse ``A < B`` (A acts before B), ``A > B``, optionally followed by ``@ TURN``."""
+    body, _, turn = text.partition("@")
+    turn = turn.strip().upper() or None
+    if turn is not None and turn not in BOSS_TURNS:
+        raise ValueError(f"Unknown boss turn {turn!r} (expected one of {', '.join(BOSS_TURNS)})")
+    for operator in ("<", ">"):
+        if operator in body:
+            left, right = (part.strip() for part in body.split(operator, 1))
+            if not left or not right:
+                break
+            before, after = (left, right) if operator == "<" else (right, left)
+            return {"before": before, "after": after, "turn": turn}
+    raise ValueError(f"Constraint must look like 'Hero < BOSS @ AOE1', got {text!r}")
+
+
+def parse_constraints(lines: List[str]) -> List[Dict[str, Any]]:
+    return [parse_constraint(line) for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+def _shortest_paths(size: int, edges: List[Tuple[int, int, int]]) -> Optional[List[List[float]]]:
+    dist = [[0 if i == j else math.inf for j in range(size)] for i in range(size)]
+    for u, v, w in edges:
+        dist[u][v] = min(dist[u][v], w)
+    for k in range(size):
+        dk = dist[k]
+        for i in range(size):
+            dik = dist[i][k]
+            if dik == math.inf:
+                continue
+            di = dist[i]
+            for j in range(size):
+                if dik + dk[j] < di[j]:
+                    di[j] = dik + dk[j]
+    if any(dist[i][i] < 0 for i in range(size)):
+        return None
+    return dist
+
+
+def _negative_cycle(size: int, arcs: List[Tuple[int, int, int, int, int]]) -> Optional[List[Tuple[int, int]]]:
+    """Arcs (u, v, cost, arc index, direction) of a negative-cost cycle, or None."""
+    dist = [0] * size
+    pred: List[Optional[Tuple[int, int, int, int, int]]] = [None] * size
+    last = None
+    for _ in range(size):
+        last = None
+        for arc in arcs:
+            u, v, cost = arc[0], arc[1], arc[2]
+            if dist[u] + cost < dist[v]:
+                dist[v] = dist[u] + cost
+                pred[v] = arc
+                last = v
+        if last is None:
+            return None
+    # `last` was relaxed in the size-th pass, so walking back size steps lands on the cycle
+    node = last
+    for _ in range(size):
+        node = pred[node][0]
+    cycle = []
+    current = node
+    while True:
+        arc = pred[current]
+        cycle.append((arc[3], arc[4]))
+        current = arc[0]
+        if current == node:
+            return cycle
+
+
+def _closest_speeds(size: int, zero: int, edges: List[Tuple[int, int, int]], targets: Dict[int, int]) -> List[int]:
+    """Integer x with x[zero] = 0 and x_v - x_u <= w for every edge, minimizing
+    sum(|x_i - targets[i]|).
+
+    Each target contributes two unit-capacity arcs (zero -> i with cost t, i -> zero with
+    cost -t) next to the uncapacitated constraint arcs; after a min-cost circulation the
+    shortest-path distances from ``zero`` in the residual graph are optimal potentials.
+    """
+    # [u, v, cost, capacity, flow]; capacity None is unbounded
+    arcs: List[List[Any]] = [[u, v, w, None, 0] for u, v, w in edges]
+    for index, target in targets.items():
+        arcs.append([zero, index, target, 1, 0])
+        arcs.append([index, zero, -target, 1, 0])
+
+    def residual() -> List[Tuple[int, int, int, int, int]]:
+        result = []
+        for i, (u, v, cost, capacity, flow) in enumerate(arcs):
+            if capacity is None or flow < capacity:
+                result.append((u, v, cost, i, 1))
+            if flow > 0:
+                result.append((v, u, -cost, i, -1))
+        return result
+
+    while True:
+        cycle = _negative_cycle(size, residual())
+        if cycle is None:
+            break
+        # unbounded negative cycles cannot exist once the constraints are feasible, so every
+        # cycle crosses a unit-capacity target arc and one unit can be pushed around it
+        for i, direction in cycle:
+            arcs[i][4] += direction
+
+    dist: List[float] = [math.inf] * size
+    dist[zero] = 0
+    for _ in range(size - 1):
+        changed = False
+        for u, v, cost, _, _ in residual():
+            if dist[u] + cost < dist[v]:
+                dist[v] = dist[u] + cost
+                changed = True
+        if not changed:
+            break
+    return [int(value) for value in dist]
+
+
+def solve_speed_tune(
+    boss: Boss,
+    team: List[TeamMember],
+    constraints: List[Dict[str, Any]],
+    min_speed: int = MIN_SPEED,
+    max_speed: int = MAX_SPEED,
+) -> Dict[str, Any]:
+    names = [member.name for member in team]
+    position = {name: index for index, name in enumerate(names)}
+    boss_index = len(names)
+    position[boss.name] = boss_index
+    position[BOSS_ALIAS] = boss_index
+    zero = boss_index + 1
+
+    # x_v - x_u <= w is the edge u -> v with weight w; node `zero` is the constant 0
+    base_edges: List[Tuple[int, int, int]] = [(zero, boss_index, boss.speed), (boss_index, zero, -boss.speed)]
+    for index in range(len(names)):
+        base_edges.append((zero, index, max_speed))
+        base_edges.append((index, zero, -min_speed))
+    for constraint in constraints:
+        for key in ("before", "after"):
+            if constraint[key] not in position:
+                raise ValueError(f"Unknown actor in constraint: {constraint[key]!r}")
+        a, b = position[constraint["before"]], position[constraint["after"]]
+        if a == b:
+            raise ValueError(f"Constraint compares {constraint['before']!r} with itself")
+        # the earlier actor in list order wins speed ties
+        gap = 0 if a < b else 1
+        # speed_a - speed_b >= gap  <=>  speed_b - speed_a <= -gap
+        base_edges.append((a, b, -gap))
+
+    dist = _shortest_paths(zero + 1, base_edges)
+    if dist is None:
+        return {"feasible": False, "heroes": [], "constraints": constraints}
+
+    intervals = {name: (int(-dist[index][zero]), int(dist[zero][index])) for index, name in enumerate(names)}
+
+    speeds = _closest_speeds(zero + 1, zero, base_edges, {index: member.speed for index, member in enumerate(team)})
+    suggested = {name: speeds[index] for index, name in enumerate(names)}
+
+    heroes = [
+        {
+            "name": member.name,
+            "speed": member.speed,
+            "min_speed": intervals[member.name][0],
+            "max_speed": intervals[member.name][1],
+            "suggested_speed": suggested[member.name],
+            "change": suggested[member.name] - member.speed,
+        }
+        for member in team
+    ]
+    return {
+        "feasible": True,
+        "heroes": heroes,
+        "constraints": constraints,
+        "total_change": sum(abs(h["change"]) for h in heroes),
+        "verified": verify_speed_tune(boss, team, constraints, suggested),
+    }
+
+
+def verify_speed_tune(
+    boss: Boss, team: List[TeamMember], constraints: List[Dict[str, Any]], speeds: Dict[str, int]
+) -> bool:
+    """Check the constraints against the scheduler's own action order."""
+    original = {member.name: member.speed for member in team}
+    try:
+        for member in team:
+            member.speed = speeds.get(member.name, member.speed)
+        order = [actor.name for actor in action_order(boss, team)]
+    finally:
+        for member in team:
+            member.speed = original[member.name]
+    rank = {name: index for index, name in enumerate(order)}
+    rank[BOSS_ALIAS] = rank[boss.name]
+    return all(rank[c["before"]] < rank[c["after"]] for c in constraints)
+
+
+def format_speed_tune(result: Dict[str, Any]) -> str:
+    if not result["feasible"]:
+        return "No speed tune satisfies all constraints (they contradict each other or the boss speed)."
+    lines = [f"{'Hero':<16}{'Speed':>7}{'Range':>13}{'Tune':>7}{'Change':>8}"]
+    for hero in result["heroes"]:
+        lines.append(
+            f"{hero['name']:<16}{hero['speed']:>7}{hero['min_speed']:>6}-{hero['max_speed']:<6}"
+            f"{hero['suggested_speed']:>7}{hero['change']:>+8}"
+        )
+    lines.append(f"Total speed change: {result['total_change']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute hero speed ranges for desired turn orders")
+    parser.add_argument("--boss", required=True, help="Path to boss file (yaml/json/csv/xlsx)")
+    parser.add_argument("--team", required=True, help="Path to team file (yaml/json/csv/xlsx)")
+    parser.add_argument(
+        "--constraint",
+        "-c",
+        action="append",
+        default=[],
+        help="Ordering constraint such as 'Seeker < BOSS @ AOE1' (repeatable)",
+    )
+    parser.add_argument("--constraints", default=None, help="Text file with one constraint per line")
+    parser.add_argument("--max-speed", type=int, default=MAX_SPEED)
+    args = parser.parse_args()
+
+    lines = list(args.constraint)
+    if args.constraints:
+        with open(args.constraints, "r", encoding="utf-8") as f:
+            lines.extend(f.read().splitlines())
+    boss_data, team_rows, _ = load_inputs(args.boss, args.team)
+    result = solve_speed_tune(build_boss(boss_data), build_team(team_rows), parse_constraints(lines), max_speed=args.max_speed)
+    print(format_speed_tune(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -116,6 +116,20 @@ def parse_heroes_from_form(form) -> List[Dict[str, Any]]:
     return heroes
 
 
+def hero_abilities(hero: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    if isinstance(hero.get("abilities"), dict):
+        return hero["abilities"]
+    # normalized editor rows only carry the flat aN_priority / aN_cooldown fields
+    return {
+        name: {
+            "multiplier": 1.0,
+            "priority": int(hero.get(f"{name.lower()}_priority", default_priority)),
+            "cooldown": int(hero.get(f"{name.lower()}_cooldown", default_cooldown)),
+        }
+        for name, default_priority, default_cooldown in (("A1", 3, 0), ("A2", 2, 3), ("A3", 1, 4), ("A4", 0, 0))
+    }
+
+
 def build_selected_team(heroes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return [
         {
@@ -128,8 +142,8 @@ def build_selected_team(heroes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             "speed": h["speed"],
             "crit_rate": h["crit_rate"],
             "crit_damage": h["crit_damage"],
-            "skill_multiplier": h["skill_multiplier"],
-            "abilities": h["abilities"],
+            "skill_multiplier": h.get("skill_multiplier", 1.0),
+            "abilities": hero_abilities(h),
         }
         for h in heroes
         if h.get("selected")
@@ -15,14 +15,18 @@ def build_simulation_preview(out_path: str) -> tuple[str, str | None]:
     except Exception as error:
         return "", f"Nem sikerült beolvasni a szimulációs fájlt: {error}"
 
+    return format_simulation_preview(data, out_path), None
+
+
+def format_simulation_preview(data: Any, out_path: str) -> str:
     if isinstance(data, list):
         preview_data = data[:5]
         suffix = ""
         if len(data) > 5:
             suffix = f"\n\n... további {len(data) - 5} kör a fájlban ({out_path})"
-        return json.dumps(preview_data, indent=2, ensure_ascii=False) + suffix, None
+        return json.dumps(preview_data, indent=2, ensure_ascii=False) + suffix
 
-    return json.dumps(data, indent=2, ensure_ascii=False), None
+    return json.dumps(data, indent=2, ensure_ascii=False)
 
 
 def build_excel_embed_url(web_url: str | None) -> str | None:
@@ -31,7 +35,27 @@ def build_excel_embed_url(web_url: str | None) -> str | None:
     return f"https://view.officeapps.live.com/op/embed.aspx?src={quote(web_url, safe='')}"
 
 
-def build_turn_order_rows(out_path: str, max_rows: int = 500) -> tuple[List[Dict[str, Any]], str | None]:
+TURN_ORDER_MAX_ROWS = 500
+
+
+def build_round_turn_rows(round_data: Any, global_turn_start: int = 0) -> List[Dict[str, Any]]:
+    round_no = round_data.get("round") if isinstance(round_data, dict) else None
+    events = round_data.get("events", []) if isinstance(round_data, dict) else []
+    return [
+        {
+            "global_turn": global_turn_start + index,
+            "round": round_no,
+            "turn_in_round": index + 1,
+            "actor": event.get("actor", ""),
+            "ability": event.get("ability", "A1"),
+            "target": event.get("target", ""),
+            "damage": event.get("dmg", 0),
+        }
+        for index, event in enumerate(events)
+    ]
+
+
+def build_turn_order_rows(out_path: str, max_rows: int = TURN_ORDER_MAX_ROWS) -> tuple[List[Dict[str, Any]], str | None]:
     if not os.path.exists(out_path):
         return [], None
 
@@ -43,23 +67,14 @@ def build_turn_order_rows(out_path: str, max_rows: int = 500) -> tuple[List[Dict
     if not isinstance(data, list):
         return [], "A szimulációs fájl formátuma nem megfelelő a turn táblához."
 
+    return build_turn_order_rows_from_log(data, max_rows), None
+
+
+def build_turn_order_rows_from_log(data: List[Any], max_rows: int = TURN_ORDER_MAX_ROWS) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
-    global_turn = 0
     for round_data in data:
-        round_no = round_data.get("round") if isinstance(round_data, dict) else None
-        events = round_data.get("events", []) if isinstance(round_data, dict) else []
-        for turn_in_round, event in enumerate(events, start=1):
-            rows.append(
-                {
-                    "global_turn": global_turn,
-                    "round": round_no,
-                    "turn_in_round": turn_in_round,
-                    "actor": event.get("actor", ""),
-                    "ability": event.get("ability", "A1"),
-                    "target": event.get("target", ""),
-                    "damage": event.get("dmg", 0),
-                }
-            )
-            global_turn += 1
-
-    return rows[:max_rows], None
+        rows.extend(build_round_turn_rows(round_data, len(rows)))
+        if len(rows) >= max_rows:
+            break
+
+    return rows[:max_rows]
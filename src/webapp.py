@@ -1,15 +1,109 @@
 import argparse
+import atexit
+import json
+import multiprocessing
 import os
-from typing import Any, Dict, List
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
 
-from flask import Flask, redirect, render_template, request, send_file, url_for
+from flask import Flask, Response, jsonify, redirect, render_template, request, send_file, stream_with_context, url_for
 
-from .exporter import export_log_to_excel
+from .advisor import advise_upgrades
+from .exporter import EXPORT_FORMATS, ExportCache, log_digest
 from .io import load_data, save_data
+from .montecarlo import build_fight, iter_adaptive_trials, run_adaptive_trials, simulate_summary
 from .onedrive import upload_file_to_onedrive
-from .simulator import build_boss, build_team, run_simulation
+from .simulator import build_boss, build_team, iter_simulation, run_simulation
+from .speedtune import parse_constraints, solve_speed_tune
 from .web_hero import build_selected_team, ensure_min_hero_slots, normalize_heroes, parse_heroes_from_form
-from .web_views import build_excel_embed_url, build_simulation_preview, build_turn_order_rows
+from .web_views import (
+    TURN_ORDER_MAX_ROWS,
+    build_excel_embed_url,
+    build_round_turn_rows,
+    build_simulation_preview,
+    build_turn_order_rows,
+    build_turn_order_rows_from_log,
+    format_simulation_preview,
+)
+
+# live stream batching: send an event once this many turn rows are pending or this much time has passed
+STREAM_BATCH_ROWS = 200
+STREAM_FLUSH_SECONDS = 0.1
+
+API_MAX_ROUNDS = 1000
+API_MAX_TRIALS = 10000
+ADVISOR_MAX_TRIALS = 2000
+
+EXPORT_MIMETYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def parse_api_scenarios(payload: Any, max_scenarios: int) -> List[Dict[str, Any]]:
+    if isinstance(payload, dict) and "scenarios" in payload:
+        payload = payload["scenarios"]
+    raw_scenarios = payload if isinstance(payload, list) else [payload]
+    if not raw_scenarios:
+        raise ValueError("Legalább egy szcenárió kell.")
+    if len(raw_scenarios) > max_scenarios:
+        raise ValueError(f"Legfeljebb {max_scenarios} szcenárió küldhető egy kérésben.")
+
+    scenarios = []
+    for index, raw in enumerate(raw_scenarios):
+        if not isinstance(raw, dict):
+            raise ValueError(f"#{index}: a szcenárió JSON objektum kell legyen.")
+        boss = raw.get("boss")
+        team = raw.get("team")
+        abilities = raw.get("abilities")
+        if not isinstance(boss, dict):
+            raise ValueError(f"#{index}: a 'boss' mező objektum kell legyen.")
+        if not isinstance(team, list) or not team or not all(isinstance(row, dict) for row in team):
+            raise ValueError(f"#{index}: a 'team' mező nem üres hős lista kell legyen.")
+        if abilities is not None and not isinstance(abilities, dict):
+            raise ValueError(f"#{index}: az 'abilities' mező objektum kell legyen.")
+        rounds = int(raw.get("rounds", 50))
+        trials = int(raw.get("trials", 1))
+        seed = raw.get("seed")
+        if not 1 <= rounds <= API_MAX_ROUNDS:
+            raise ValueError(f"#{index}: a 'rounds' 1 és {API_MAX_ROUNDS} között lehet.")
+        if not 1 <= trials <= API_MAX_TRIALS:
+            raise ValueError(f"#{index}: a 'trials' 1 és {API_MAX_TRIALS} között lehet.")
+        scenarios.append(
+            {
+                "boss_data": boss,
+                "team_rows": team,
+                "abilities": abilities,
+                "rounds": rounds,
+                "seed": int(seed) if seed is not None else None,
+                "trials": trials,
+            }
+        )
+    return scenarios
+
+
+def run_api_scenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return simulate_summary(**scenario)
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+
+
+def format_trials_message(summary: Dict[str, Any]) -> str:
+    return (
+        f" Átlagos összsebzés: {summary['mean']:.0f} ± {summary['half_width']:.0f} "
+        f"({summary['trials']} próba alapján"
+        f"{'' if summary['converged'] else ', a pontossági cél nem teljesült az időkereten belül'})."
+    )
 
 
 def create_app(
@@ -23,6 +117,11 @@ def create_app(
     onedrive_tenant: str | None,
     onedrive_remote: str | None,
     default_rounds: int,
+    trial_time_budget: float = 5.0,
+    api_workers: int | None = None,
+    api_max_scenarios: int = 100,
+    export_cache_dir: str | None = None,
+    uploader: Callable[..., str] = upload_file_to_onedrive,
 ) -> Flask:
     app = Flask(__name__)
     app.config["HEROES_PATH"] = os.path.abspath(heroes_path)
@@ -36,16 +135,113 @@ def create_app(
     app.config["ONEDRIVE_REMOTE"] = onedrive_remote
     app.config["EXCEL_WEB_URL"] = None
     app.config["EXCEL_EMBED_URL"] = None
+    app.config["ONEDRIVE_UPLOAD"] = None
+    app.config["ONEDRIVE_UPLOAD_ERROR"] = None
+    app.config["SPEED_TUNE_TEXT"] = ""
+    app.config["SPEED_TUNE_RESULT"] = None
+    app.config["ADVISOR_RESULT"] = None
     app.config["DEFAULT_ROUNDS"] = default_rounds
+    app.config["TRIAL_TIME_BUDGET"] = trial_time_budget
+    app.config["API_WORKERS"] = api_workers
+    app.config["API_MAX_SCENARIOS"] = api_max_scenarios
+    app.config["EXPORT_CACHE_DIR"] = os.path.abspath(
+        export_cache_dir or os.path.join(tempfile.gettempdir(), "raid-simulator-exports")
+    )
+    # the latest battle log stays in memory; files and exports are produced from it on demand
+    app.config["LAST_LOG"] = None
+    app.config["LAST_LOG_DIGEST"] = None
+    app.config["EXCEL_OUT_DIGEST"] = None
+
+    export_cache = ExportCache(app.config["EXPORT_CACHE_DIR"])
+    log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="battle-log-writer")
+    upload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="onedrive-upload")
+
+    # workers come from a forkserver (spawn where there is none, e.g. Windows): forking the
+    # threaded app could copy locks held by the log writer or uploader threads into the children
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    api_pool = ProcessPoolExecutor(max_workers=api_workers, mp_context=multiprocessing.get_context(start_method))
+    atexit.register(api_pool.shutdown, cancel_futures=True)
 
     def load_heroes() -> List[Dict[str, Any]]:
         raw = load_data(app.config["HEROES_PATH"])
         return ensure_min_hero_slots(normalize_heroes(raw))
 
+    def load_fight_inputs():
+        selected_team_raw = build_selected_team(load_heroes())
+        boss_data = load_data(app.config["BOSS_PATH"])
+        boss_data = boss_data if isinstance(boss_data, dict) else boss_data[0]
+        abilities = load_data(app.config["ABILITIES_PATH"]) if app.config["ABILITIES_PATH"] else None
+        return boss_data, selected_team_raw, abilities if isinstance(abilities, dict) else None
+
+    def current_log():
+        """The latest battle log and its digest, from memory or (after a restart) from OUT_PATH."""
+        log = app.config["LAST_LOG"]
+        if log is None:
+            if not os.path.exists(app.config["OUT_PATH"]):
+                return None, None
+            log = load_data(app.config["OUT_PATH"])
+            if not isinstance(log, list):
+                return None, None
+            app.config["LAST_LOG"] = log
+            app.config["LAST_LOG_DIGEST"] = log_digest(log)
+        return log, app.config["LAST_LOG_DIGEST"]
+
+    def write_excel_out(log: List[Dict[str, Any]], digest: str) -> str:
+        """Build (or reuse) the workbook and mirror it to EXCEL_OUT_PATH; returns the cached file."""
+        path = export_cache.get(log, "xlsx", digest)
+        excel_out = app.config["EXCEL_OUT_PATH"]
+        if app.config["EXCEL_OUT_DIGEST"] != digest or not os.path.exists(excel_out):
+            # replace atomically: other requests may still be reading the previous file
+            tmp = f"{excel_out}.{threading.get_ident()}.tmp"
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, excel_out)
+            app.config["EXCEL_OUT_DIGEST"] = digest
+        return path
+
+    def upload_excel(log: List[Dict[str, Any]], digest: str) -> str:
+        remote_path = app.config["ONEDRIVE_REMOTE"] or os.path.basename(app.config["EXCEL_OUT_PATH"])
+        return uploader(
+            write_excel_out(log, digest),
+            remote_path,
+            app.config["ONEDRIVE_CLIENT_ID"],
+            tenant_id=app.config["ONEDRIVE_TENANT"],
+        )
+
+    def save_results(log: List[Dict[str, Any]]) -> str:
+        digest = log_digest(log)
+        app.config["LAST_LOG"] = log
+        app.config["LAST_LOG_DIGEST"] = digest
+        # the JSON log is written in the background; Excel/CSV are built when first downloaded
+        log_writer.submit(save_data, log, app.config["OUT_PATH"])
+
+        if not app.config["ONEDRIVE_CLIENT_ID"]:
+            return ""
+        # upload in the background so the page can already show the local results
+        upload = upload_executor.submit(upload_excel, log, digest)
+        upload.add_done_callback(on_upload_done)
+        app.config["ONEDRIVE_UPLOAD"] = upload
+        return " OneDrive feltöltés elindult, a beágyazás a feltöltés után frissül."
+
+    def on_upload_done(future):
+        try:
+            web_url = future.result()
+        except Exception as error:
+            app.config["ONEDRIVE_UPLOAD_ERROR"] = str(error)
+            return
+        app.config["ONEDRIVE_UPLOAD_ERROR"] = None
+        app.config["EXCEL_WEB_URL"] = web_url
+        app.config["EXCEL_EMBED_URL"] = build_excel_embed_url(web_url)
+
     @app.get("/")
     def index():
-        simulation_preview, simulation_error = build_simulation_preview(app.config["OUT_PATH"])
-        turn_order_rows, turn_order_error = build_turn_order_rows(app.config["OUT_PATH"])
+        upload = app.config["ONEDRIVE_UPLOAD"]
+        log = app.config["LAST_LOG"]
+        if log is not None:
+            simulation_preview, simulation_error = format_simulation_preview(log, app.config["OUT_PATH"]), None
+            turn_order_rows, turn_order_error = build_turn_order_rows_from_log(log), None
+        else:
+            simulation_preview, simulation_error = build_simulation_preview(app.config["OUT_PATH"])
+            turn_order_rows, turn_order_error = build_turn_order_rows(app.config["OUT_PATH"])
         return render_template(
             "index.html",
             heroes=load_heroes(),
@@ -63,14 +259,52 @@ def create_app(
             turn_order_error=turn_order_error,
             excel_web_url=app.config["EXCEL_WEB_URL"],
             excel_embed_url=app.config["EXCEL_EMBED_URL"],
+            onedrive_upload_pending=upload is not None and not upload.done(),
+            onedrive_upload_error=app.config["ONEDRIVE_UPLOAD_ERROR"],
+            speed_tune_text=app.config["SPEED_TUNE_TEXT"],
+            speed_tune_result=app.config["SPEED_TUNE_RESULT"],
+            advisor_result=app.config["ADVISOR_RESULT"],
+            advisor_max_trials=ADVISOR_MAX_TRIALS,
         )
 
     @app.get("/excel/download")
     def download_excel():
         excel_path = app.config["EXCEL_OUT_PATH"]
+        try:
+            log, digest = current_log()
+            if log is not None:
+                excel_path = write_excel_out(log, digest)
+        except Exception as error:
+            return redirect(url_for("index", message=f"Excel készítés hiba: {error}"))
         if not os.path.exists(excel_path):
             return redirect(url_for("index", message=f"Excel fájl még nem létezik: {excel_path}"))
-        return send_file(excel_path, as_attachment=True)
+        return send_file(excel_path, as_attachment=True, download_name=os.path.basename(app.config["EXCEL_OUT_PATH"]))
+
+    @app.get("/export/<fmt>")
+    def download_export(fmt: str):
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"error": f"Ismeretlen formátum: {fmt} ({', '.join(EXPORT_FORMATS)})"}), 404
+        log, digest = current_log()
+        if log is None:
+            return redirect(url_for("index", message="Még nincs szimulációs eredmény az exporthoz."))
+        path = export_cache.get(log, fmt, digest)
+        name = f"{os.path.splitext(os.path.basename(app.config['OUT_PATH']))[0]}.{fmt}"
+        return send_file(path, mimetype=EXPORT_MIMETYPES[fmt], as_attachment=True, download_name=name)
+
+    @app.get("/export")
+    def prepare_exports():
+        """Build several formats at once (in parallel) and return their download URLs."""
+        formats = [fmt.strip() for fmt in request.args.get("formats", ",".join(EXPORT_FORMATS)).split(",") if fmt.strip()]
+        unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+        if unknown:
+            return jsonify({"error": f"Ismeretlen formátum: {', '.join(unknown)}"}), 400
+        log, digest = current_log()
+        if log is None:
+            return jsonify({"error": "Még nincs szimulációs eredmény az exporthoz."}), 404
+        export_cache.get_many(log, formats, digest)
+        return jsonify(
+            {"digest": digest, "exports": {fmt: url_for("download_export", fmt=fmt) for fmt in formats}}
+        )
 
     @app.post("/save")
     def save():
@@ -91,46 +325,171 @@ def create_app(
     def simulate():
         try:
             rounds = int(request.form.get("rounds", app.config["DEFAULT_ROUNDS"]))
-            heroes = load_heroes()
-            selected_team_raw = build_selected_team(heroes)
+            target_rel_ci = float(request.form.get("target_rel_ci") or 0) / 100.0
+            boss_data, selected_team_raw, abilities = load_fight_inputs()
 
             if not selected_team_raw:
                 return redirect(url_for("index", message="Nincs kijelölt csapattag a szimulációhoz."))
 
-            boss_data = load_data(app.config["BOSS_PATH"])
-            boss = build_boss(boss_data if isinstance(boss_data, dict) else boss_data[0])
-            if app.config["ABILITIES_PATH"]:
-                abilities = load_data(app.config["ABILITIES_PATH"])
-                if isinstance(abilities, dict):
-                    boss.abilities.update(abilities)
-
-            team = build_team(selected_team_raw)
+            boss, team = build_fight(boss_data, selected_team_raw, abilities)
             log = run_simulation(boss, team, rounds=rounds)
-            save_data(log, app.config["OUT_PATH"])
-            export_log_to_excel(log, app.config["EXCEL_OUT_PATH"])
-
-            excel_message = ""
-            if app.config["ONEDRIVE_CLIENT_ID"]:
-                remote_path = app.config["ONEDRIVE_REMOTE"] or os.path.basename(app.config["EXCEL_OUT_PATH"])
-                web_url = upload_file_to_onedrive(
-                    app.config["EXCEL_OUT_PATH"],
-                    remote_path,
-                    app.config["ONEDRIVE_CLIENT_ID"],
-                    tenant_id=app.config["ONEDRIVE_TENANT"],
+            excel_message = save_results(log)
+
+            trials_message = ""
+            if target_rel_ci > 0:
+                summary = run_adaptive_trials(
+                    boss_data,
+                    selected_team_raw,
+                    abilities,
+                    rounds=rounds,
+                    target_rel_half_width=target_rel_ci,
+                    time_budget=app.config["TRIAL_TIME_BUDGET"],
                 )
-                app.config["EXCEL_WEB_URL"] = web_url
-                app.config["EXCEL_EMBED_URL"] = build_excel_embed_url(web_url)
-                excel_message = " OneDrive feltöltés kész, beágyazás frissítve."
+                trials_message = format_trials_message(summary)
 
             msg = (
-                f"Szimuláció kész ({len(log)} kör). Mentve ide: {app.config['OUT_PATH']}. "
-                f"Excel mentve ide: {app.config['EXCEL_OUT_PATH']}.{excel_message}"
+                f"Szimuláció kész ({len(log)} kör). Mentés ide: {app.config['OUT_PATH']}, "
+                f"az Excel letöltéskor készül.{trials_message}{excel_message}"
             )
         except Exception as error:
             msg = f"Szimuláció hiba: {error}"
 
         return redirect(url_for("index", message=msg))
 
+    @app.post("/api/simulate")
+    def api_simulate():
+        """Stateless JSON simulation: inline boss/team/abilities (or a list of scenarios) in,
+        summaries out. Nothing is read from or written to the configured files."""
+        payload = request.get_json(silent=True)
+        if payload is None:
+            return jsonify({"error": "JSON kérés törzs szükséges."}), 400
+        try:
+            scenarios = parse_api_scenarios(payload, app.config["API_MAX_SCENARIOS"])
+        except (TypeError, ValueError) as error:
+            return jsonify({"error": str(error)}), 400
+
+        if len(scenarios) == 1:
+            results = [run_api_scenario(scenarios[0])]
+        else:
+            results = list(api_pool.map(run_api_scenario, scenarios, chunksize=max(1, len(scenarios) // 32)))
+
+        if isinstance(payload, dict) and "scenarios" not in payload:
+            return jsonify(results[0])
+        return jsonify({"results": results})
+
+    @app.post("/speedtune")
+    def speedtune():
+        text = request.form.get("constraints", "")
+        app.config["SPEED_TUNE_TEXT"] = text
+        try:
+            boss_data, selected_team_raw, _ = load_fight_inputs()
+            if not selected_team_raw:
+                return redirect(url_for("index", message="Nincs kijelölt csapattag a speed tune-hoz."))
+            result = solve_speed_tune(build_boss(boss_data), build_team(selected_team_raw), parse_constraints(text.splitlines()))
+            app.config["SPEED_TUNE_RESULT"] = result
+            if result["feasible"]:
+                msg = f"Speed tune kész, összes sebesség változás: {result['total_change']}."
+            else:
+                msg = "Nincs olyan sebesség beállítás, amely minden feltételt teljesít."
+        except Exception as error:
+            app.config["SPEED_TUNE_RESULT"] = None
+            msg = f"Speed tune hiba: {error}"
+        return redirect(url_for("index", message=msg))
+
+    @app.post("/advisor")
+    def advisor():
+        try:
+            trials = int(request.form.get("trials") or 200)
+            if not 2 <= trials <= ADVISOR_MAX_TRIALS:
+                return redirect(url_for("index", message=f"A próbák száma 2 és {ADVISOR_MAX_TRIALS} között lehet."))
+            boss_data, selected_team_raw, abilities = load_fight_inputs()
+            if not selected_team_raw:
+                return redirect(url_for("index", message="Nincs kijelölt csapattag a tanácsadóhoz."))
+            result = advise_upgrades(
+                boss_data, selected_team_raw, abilities, rounds=app.config["DEFAULT_ROUNDS"], trials=trials
+            )
+            app.config["ADVISOR_RESULT"] = result
+            top = result["ranking"][0]
+            msg = f"Tanácsadó kész: legjobb fejlesztés {top['hero']} {top['label']} ({top['gain']:+.0f} sebzés)."
+        except Exception as error:
+            app.config["ADVISOR_RESULT"] = None
+            msg = f"Tanácsadó hiba: {error}"
+        return redirect(url_for("index", message=msg))
+
+    @app.get("/simulate/stream")
+    def simulate_stream():
+        """Server-Sent Events: turn rows and running damage totals while the fight runs,
+        then trial progress, then a final message once the log is kept for export."""
+        raw_rounds = request.args.get("rounds", app.config["DEFAULT_ROUNDS"])
+        raw_target = request.args.get("target_rel_ci") or 0
+
+        def generate():
+            try:
+                # parsed here so bad values reach the browser as an error event
+                rounds = int(raw_rounds)
+                target_percent = float(raw_target)
+                if not 1 <= rounds <= API_MAX_ROUNDS:
+                    raise ValueError(f"a körszám 1 és {API_MAX_ROUNDS} között lehet")
+                if not 0 <= target_percent <= 100:
+                    raise ValueError("a pontossági cél 0 és 100% között lehet")
+                target_rel_ci = target_percent / 100.0
+
+                boss_data, selected_team_raw, abilities = load_fight_inputs()
+                if not selected_team_raw:
+                    yield sse_event("error", {"message": "Nincs kijelölt csapattag a szimulációhoz."})
+                    return
+
+                boss, team = build_fight(boss_data, selected_team_raw, abilities)
+                yield sse_event("start", {"rounds": rounds, "team": [member.name for member in team]})
+
+                log: List[Dict[str, Any]] = []
+                totals: Dict[str, int] = {member.name: 0 for member in team}
+                pending: List[Dict[str, Any]] = []
+                global_turn = 0
+                last_flush = time.perf_counter()
+                for round_data in iter_simulation(boss, team, rounds=rounds):
+                    log.append(round_data)
+                    rows = build_round_turn_rows(round_data, global_turn)
+                    global_turn += len(rows)
+                    pending.extend(row for row in rows if row["global_turn"] < TURN_ORDER_MAX_ROWS)
+                    for member in round_data.get("team", []):
+                        totals[member["name"]] = totals.get(member["name"], 0) + int(member.get("damage_done", 0))
+
+                    now = time.perf_counter()
+                    if len(pending) >= STREAM_BATCH_ROWS or now - last_flush >= STREAM_FLUSH_SECONDS:
+                        yield sse_event("rounds", {"round": round_data["round"], "rows": pending, "totals": totals})
+                        pending = []
+                        last_flush = now
+                yield sse_event("rounds", {"round": len(log), "rows": pending, "totals": totals})
+
+                trials_message = ""
+                if target_rel_ci > 0:
+                    for summary in iter_adaptive_trials(
+                        boss_data,
+                        selected_team_raw,
+                        abilities,
+                        rounds=rounds,
+                        target_rel_half_width=target_rel_ci,
+                        time_budget=app.config["TRIAL_TIME_BUDGET"],
+                    ):
+                        yield sse_event(
+                            "trials",
+                            {key: summary[key] for key in ("trials", "mean", "half_width", "stop_reason")},
+                        )
+                    trials_message = format_trials_message(summary)
+
+                excel_message = save_results(log)
+                message = (
+                    f"Szimuláció kész ({len(log)} kör). Mentés ide: {app.config['OUT_PATH']}, "
+                    f"az Excel letöltéskor készül.{trials_message}{excel_message}"
+                )
+                yield sse_event("done", {"message": message})
+            except Exception as error:
+                yield sse_event("error", {"message": f"Szimuláció hiba: {error}"})
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
     return app
 
 
@@ -146,6 +505,10 @@ def main():
     parser.add_argument("--onedrive-tenant", default=None, help="Azure tenant id (opcionális)")
     parser.add_argument("--onedrive-remote", default=None, help="OneDrive célútvonal, pl. Raid/battle_log.xlsx")
     parser.add_argument("--rounds", type=int, default=50, help="Alapértelmezett körszám")
+    parser.add_argument("--trial-time-budget", type=float, default=5.0, help="Ismételt próbák időkerete másodpercben")
+    parser.add_argument("--api-workers", type=int, default=None, help="/api/simulate folyamatok száma (alap: CPU szám)")
+    parser.add_argument("--api-max-scenarios", type=int, default=100, help="/api/simulate szcenárió limit kérésenként")
+    parser.add_argument("--export-cache", default=None, help="Export gyorsítótár mappa (alap: rendszer temp mappa)")
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=8000)
     args = parser.parse_args()
@@ -161,6 +524,10 @@ def main():
         onedrive_tenant=args.onedrive_tenant,
         onedrive_remote=args.onedrive_remote,
         default_rounds=args.rounds,
+        trial_time_budget=args.trial_time_budget,
+        api_workers=args.api_workers,
+        api_max_scenarios=args.api_max_scenarios,
+        export_cache_dir=args.export_cache,
     )
     app.run(host=args.host, port=args.port, debug=False)
 